@@ -1,3 +1,7 @@
+import base64
+import binascii
+import uuid
+from datetime import datetime
 from flask import Blueprint, jsonify, request
 from services.database_service import DatabaseService
 from services.security_service import SecurityService
@@ -5,11 +9,32 @@ from services.auth_service import require_oauth2_client_credentials
 
 database_bp = Blueprint('database', __name__, url_prefix='/api')
 
+# Állapotmentes validációhoz egyetlen példány kérésenkénti példányosítás helyett
+_SECURITY = SecurityService()
+
 def get_db_service():
     """Database service lekérése a Flask app context-ből"""
     from flask import current_app
     return DatabaseService(current_app.db_manager)
 
+def encode_cursor(record):
+    """Keyset cursor kódolása az utolsó rekordból: base64(created_at|id)"""
+    raw = f"{record['created_at']}|{record['id']}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor):
+    """Keyset cursor dekódolása (created_at, id) párra - hibás cursor esetén ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+    except (binascii.Error, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+    
+    created_at, sep, record_id = raw.rpartition('|')
+    if not sep or not record_id:
+        raise ValueError("Invalid cursor format")
+    # Manipulált cursor: nem-UUID id a DB-ben hibát okozna (üres oldal 200-zal) -> itt ValueError (400)
+    return datetime.fromisoformat(created_at), str(uuid.UUID(record_id))
+
 @database_bp.route('/tables', methods=['GET'])
 @require_oauth2_client_credentials
 def list_tables():
@@ -42,10 +67,8 @@ def get_table_schema(table_name):
     if not auth_email:
         return jsonify({'error': 'X-Auth-Email header required'}), 400
         
-    security_service = SecurityService()
-    
     # Tábla név validálása
-    if not security_service.validate_table_name(table_name):
+    if not _SECURITY.validate_table_name(table_name):
         return jsonify({
             'status': 'error', 
             'message': 'Invalid table name'
@@ -73,10 +96,8 @@ def get_records(table_name):
     if not auth_email:
         return jsonify({'error': 'X-Auth-Email header required'}), 400
         
-    security_service = SecurityService()
-    
     # Tábla név validálása
-    if not security_service.validate_table_name(table_name):
+    if not _SECURITY.validate_table_name(table_name):
         return jsonify({
             'status': 'error', 
             'message': 'Invalid table name'
@@ -85,11 +106,13 @@ def get_records(table_name):
     db_service = get_db_service()
     
     limit = int(request.args.get('limit', 100))
+    # DEPRECATED: offset alapú lapozás csak visszafelé kompatibilitás miatt, helyette ?after=<cursor>
     offset = int(request.args.get('offset', 0))
+    after = request.args.get('after')
     email_filter = request.args.get('email')
     
     # Email filter validálása ha van
-    if email_filter and not security_service.validate_email(email_filter):
+    if email_filter and not _SECURITY.validate_email(email_filter):
         return jsonify({
             'status': 'error',
             'message': 'Invalid email filter'
@@ -98,8 +121,29 @@ def get_records(table_name):
     # Tenant info
     tenant = getattr(request, 'oauth_tenant', 'unknown')
     
-    records = db_service.get_records(table_name, limit, offset, email_filter)
-    count = db_service.count_records(table_name, email_filter)
+    if after:
+        # Keyset lapozás: O(limit) a mélységtől függetlenül
+        try:
+            after_ts, after_id = decode_cursor(after)
+        except ValueError:
+            return jsonify({
+                'status': 'error',
+                'message': 'Invalid cursor'
+            }), 400
+        # limit + 1 sor: a plusz sor jelzi, van-e következő oldal (COUNT nélkül)
+        records = db_service.get_records_after(table_name, after_ts, after_id, limit + 1, email_filter)
+    else:
+        records = db_service.get_records(table_name, limit + 1, offset, email_filter)
+    
+    has_more = len(records) > limit
+    records = records[:limit]
+    
+    # COUNT(*) teljes táblát olvas: cursor-os lapozásnál csak kérésre (?with_total=1)
+    with_total = request.args.get('with_total', '').lower() in ('1', 'true')
+    count = db_service.count_records(table_name, email_filter) if not after or with_total else None
+    
+    # Következő oldal cursor-a (ha van még rekord)
+    next_cursor = encode_cursor(records[-1]) if has_more else None
     
     return jsonify({
         'status': 'success',
@@ -108,6 +152,8 @@ def get_records(table_name):
         'total': count,
         'limit': limit,
         'offset': offset,
+        'next_cursor': next_cursor,
+        'has_more': has_more,
         'tenant': tenant,
         'authenticated_user': auth_email
     })
@@ -121,10 +167,8 @@ def truncate_table(table_name):
     if not auth_email:
         return jsonify({'error': 'X-Auth-Email header required'}), 400
         
-    security_service = SecurityService()
-    
     # Tábla név validálása
-    if not security_service.validate_table_name(table_name):
+    if not _SECURITY.validate_table_name(table_name):
         return jsonify({
             'status': 'error', 
             'message': 'Invalid table name'
@@ -8,11 +8,16 @@ logger = logging.getLogger(__name__)
 
 import_bp = Blueprint('import', __name__, url_prefix='/api/import')
 
+# Process-szintű import service (az app db_manager-éhez kötve)
+_import_service = None
+
 def get_import_service():
-    """Import service lekérése"""
+    """Import service lekérése - egy példány processzenként, nem kérésenként"""
+    global _import_service
     from flask import current_app
-    db_service = DatabaseService(current_app.db_manager)
-    return ImportService(db_service)
+    if _import_service is None or _import_service.db_service.db_manager is not current_app.db_manager:
+        _import_service = ImportService(DatabaseService(current_app.db_manager))
+    return _import_service
 
 @import_bp.route('/<table_name>', methods=['POST'])
 @require_flexible_auth  # API Key VAGY OAuth2 auth
@@ -35,7 +40,7 @@ def import_file(table_name):
     tenant = getattr(request, 'tenant', 'unknown')
     auth_method = getattr(request, 'auth_method', 'unknown')
 
-    logger.info(f"Import request - Tenant: {tenant}, Auth: {auth_method}")
+    logger.info("Import request - Tenant: %s, Auth: %s", tenant, auth_method)
 
     # Auth email lekérése (header vagy form data)
     auth_email = request.headers.get('X-Auth-Email') or request.form.get('auth_email')
@@ -56,7 +61,7 @@ def import_file(table_name):
     
     # Import service használata
     import_service = get_import_service()
-    result = import_service.import_file(file_content, filename, table_name, auth_email)
+    result = import_service.import_file(file_content, filename, table_name, auth_email, tenant)
 
     # Tenant és auth method info hozzáadása
     result['tenant'] = tenant
@@ -66,11 +71,20 @@ def import_file(table_name):
     return jsonify(result), status_code
 
 @import_bp.route('/log', methods=['GET'])
+@require_flexible_auth  # API Key VAGY OAuth2 auth
 def get_import_log():
-    """Import log lekérése"""
+    """Import log lekérése a hívó tenant-jára szűrve, keyset lapozással (?after_id=<előző oldal next_cursor-a>)"""
     limit = int(request.args.get('limit', 100))
+    after_id = request.args.get('after_id', type=int)
     import_service = get_import_service()
-    log = import_service.get_import_log(limit)
+    try:
+        log = import_service.get_import_log(request.tenant, limit, after_id)
+    except Exception as e:
+        logger.error(f"Import log lekérési hiba: {e}")
+        return jsonify({'status': 'error', 'message': 'Import log query failed'}), 500
+    
+    # Következő oldal cursor-a (ha teli oldalt kaptunk)
+    next_cursor = log[-1]['id'] if log and len(log) >= limit else None
     
-    return jsonify({'status': 'success', 'log': log})
+    return jsonify({'status': 'success', 'log': log, 'next_cursor': next_cursor})
 
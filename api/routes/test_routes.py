@@ -1,106 +1,179 @@
 from flask import Blueprint, request, jsonify
 from services.database_service import DatabaseService
+from services.security_service import SecurityService
+from app.models.base import BaseModel
+from psycopg2.extras import execute_values
 import csv
 import io
 import time
-from datetime import datetime
+import numpy as np
+from datetime import datetime, timezone
 
 test_bp = Blueprint('test', __name__, url_prefix='/test')
 
+# Shared per process (compiled patterns, no per-request allocation)
+_SECURITY = SecurityService()
+
+# Rows buffered before each bulk flush in bulk_insert_no_auth
+BULK_CHUNK_SIZE = 5000
+
+# Read size for COPY FROM STDIN (1 MiB instead of psycopg2's 8 KiB default)
+COPY_BUFFER_SIZE = 1 << 20
+
+# CSV columns consumed by bulk_insert_no_auth (products_csv)
+PRODUCT_COLUMNS = ('name', 'price', 'category', 'description', 'stock')
+
+def parse_numeric_column(values, dtype):
+    """Vectorized str -> number conversion for one CSV column (empty cell -> 0)"""
+    arr = np.char.strip(np.asarray(values, dtype=np.str_))
+    arr[arr == ''] = '0'
+    # tolist(): psycopg2 adapts native Python numbers, not NumPy scalars
+    return arr.astype(dtype).tolist()
+
+def build_product_rows(rows, col_idx, ids, now, auth_email):
+    """Build products_csv insert tuples column-wise from raw csv.reader rows"""
+    def column(i):
+        return [row[i] if i < len(row) else '' for row in rows]
+    
+    n = len(rows)
+    return list(zip(
+        ids[:n],
+        [now] * n,
+        [now] * n,
+        [auth_email] * n,
+        column(col_idx['name']),
+        parse_numeric_column(column(col_idx['price']), np.float64),
+        column(col_idx['category']),
+        column(col_idx['description']),
+        parse_numeric_column(column(col_idx['stock']), np.int64)
+    ))
+
 def get_db_service():
     from flask import current_app
     return DatabaseService(current_app.db_manager)
 
 @test_bp.route('/batch-import/<table_name>', methods=['POST'])
 def batch_import_no_auth(table_name):
-    """Batch import WITHOUT token authentication for performance testing"""
+    """Batch import WITHOUT token authentication for performance testing (COPY FROM STDIN)"""
     start_time = time.time()
     
     if 'file' not in request.files:
         return jsonify({'error': 'No file provided'}), 400
     
+    if not _SECURITY.validate_table_name(table_name):
+        return jsonify({'error': 'Invalid table name'}), 400
+    
     file = request.files['file']
-    file_content = file.read().decode('utf-8')
-    
-    # Parse CSV
-    csv_reader = csv.DictReader(io.StringIO(file_content))
-    records = list(csv_reader)
-    
-    db_service = get_db_service()
-    
-    # Batch insert - egyesével, de auth check nélkül
-    success_count = 0
-    for record in records:
-        try:
-            # Direct insert without token validation
-            db_service.insert_record(table_name, record, 'batch-test@noauth.com')
-            success_count += 1
-        except:
-            pass
-    
-    duration = time.time() - start_time
-    
-    return jsonify({
-        'status': 'success',
-        'records_processed': len(records),
-        'records_inserted': success_count,
-        'duration_seconds': round(duration, 2),
-        'records_per_second': round(success_count / duration, 2) if duration > 0 else 0
-    })
+    # Raw byte stream: COPY reads it directly, no str decode/re-encode per line
+    stream = file.stream
+    
+    # Header -> COPY column list (id/created_at/updated_at column DEFAULT-ból)
+    header = next(csv.reader([stream.readline().decode('utf-8-sig')]), [])
+    columns = [col.strip() for col in header]
+    if not columns or not all(_SECURITY.validate_table_name(col) for col in columns):
+        return jsonify({'error': 'Invalid CSV header'}), 400
+    
+    from flask import current_app
+    
+    conn = current_app.db_manager._get_connection()
+    cursor = conn.cursor()
+    
+    try:
+        # Single COPY round-trip instead of one INSERT per row
+        cursor.copy_expert(
+            f"COPY {table_name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, ENCODING 'UTF8')",
+            stream,
+            size=COPY_BUFFER_SIZE
+        )
+        conn.commit()
+        inserted_count = cursor.rowcount
+        
+        duration = time.time() - start_time
+        
+        return jsonify({
+            'status': 'success',
+            'records_processed': inserted_count,
+            'records_inserted': inserted_count,
+            'duration_seconds': round(duration, 2),
+            'records_per_second': round(inserted_count / duration, 2) if duration > 0 else 0
+        })
+        
+    except Exception as e:
+        conn.rollback()
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        current_app.db_manager._put_connection(conn, error=False)
 
 @test_bp.route('/bulk-insert/<table_name>', methods=['POST'])
 def bulk_insert_no_auth(table_name):
-    """TRUE bulk insert with executemany for maximum performance"""
+    """TRUE bulk insert with execute_values for maximum performance (streamed CSV, chunked flush)"""
     start_time = time.time()
     
     if 'file' not in request.files:
         return jsonify({'error': 'No file provided'}), 400
     
     file = request.files['file']
-    file_content = file.read().decode('utf-8')
     
-    # Parse CSV
-    csv_reader = csv.DictReader(io.StringIO(file_content))
-    records = list(csv_reader)
+    # Stream-parse CSV: no full in-memory copy of the upload, no dict per row
+    csv_reader = csv.reader(io.TextIOWrapper(file.stream, encoding='utf-8', newline=''))
+    header = next(csv_reader, [])
+    
+    # Resolve column positions once; a missing column points past the row end -> ''
+    idx = {name.strip(): i for i, name in enumerate(header)}
+    col_idx = {col: idx.get(col, len(header)) for col in PRODUCT_COLUMNS}
     
     # Direct database connection for bulk insert
     from flask import current_app
-    import uuid
+    
+    insert_sql = """
+        INSERT INTO products_csv 
+        (id, created_at, updated_at, auth_email, name, price, category, description, stock)
+        VALUES %s
+    """
     
     conn = current_app.db_manager._get_connection()
     cursor = conn.cursor()
     
     try:
-        # Prepare bulk data
-        bulk_data = []
-        for record in records:
-            bulk_data.append((
-                str(uuid.uuid4()),
-                datetime.now(),
-                datetime.now(),
-                'bulk-test@noauth.com',
-                record.get('name', ''),
-                float(record.get('price', 0)) if record.get('price') else 0,
-                record.get('category', ''),
-                record.get('description', ''),
-                int(record.get('stock', 0)) if record.get('stock') else 0
-            ))
+        # Buffer raw rows, build + flush every BULK_CHUNK_SIZE rows
+        pending = []
+        records_processed = 0
+        inserted_count = 0
+        
+        # Same timestamp for every row (BaseModel.add_default_fields semantics)
+        now = datetime.now(timezone.utc)
+        
+        def flush():
+            # One urandom call per chunk instead of one uuid4() per row
+            ids = BaseModel.generate_uuids(len(pending))
+            bulk_data = build_product_rows(pending, col_idx, ids, now, 'bulk-test@noauth.com')
+            # Multi-row INSERT: one round-trip per page_size rows
+            execute_values(cursor, insert_sql, bulk_data, page_size=1000)
+            return len(bulk_data)
         
-        # Execute bulk insert
-        cursor.executemany("""
-            INSERT INTO products_csv 
-            (id, created_at, updated_at, auth_email, name, price, category, description, stock)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """, bulk_data)
+        for row in csv_reader:
+            # csv.reader yields [] for a blank line (DictReader skipped it) - not a product
+            if not row:
+                continue
+            pending.append(row)
+            records_processed += 1
+            
+            if len(pending) >= BULK_CHUNK_SIZE:
+                inserted_count += flush()
+                pending.clear()
+        
+        # Flush remainder at EOF
+        if pending:
+            inserted_count += flush()
         
         conn.commit()
-        inserted_count = cursor.rowcount
         
         duration = time.time() - start_time
         
         return jsonify({
             'status': 'success',
-            'records_processed': len(records),
+            'records_processed': records_processed,
             'records_inserted': inserted_count,
             'duration_seconds': round(duration, 2),
             'records_per_second': round(inserted_count / duration, 2) if duration > 0 else 0
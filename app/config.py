@@ -52,7 +52,10 @@ class Config:
             'host': os.getenv('HOST', '0.0.0.0'),
             'max_content_length': int(os.getenv('MAX_CONTENT_LENGTH', '16777216')),
             'upload_folder': os.getenv('UPLOAD_FOLDER', '/tmp'),
-            'log_level': os.getenv('LOG_LEVEL', 'INFO')
+            'log_level': os.getenv('LOG_LEVEL', 'INFO'),
+            # Connection pool méret workerenként (több gunicorn worker esetén PgBouncer ajánlott)
+            'db_pool_min': int(os.getenv('DB_POOL_MIN', '2')),
+            'db_pool_max': int(os.getenv('DB_POOL_MAX', '10'))
         }
     
     def get_database_url(self) -> str:
@@ -40,8 +40,8 @@ class DatabaseManager:
         try:
             # Kyma-barát beállítások
             self.pool = ThreadedConnectionPool(
-                minconn=2,          # Minimum connections (alacsonyabb mint korábban)
-                maxconn=10,         # Maximum connections (alacsonyabb limit)
+                minconn=self.config.app_config['db_pool_min'],  # Minimum connections (DB_POOL_MIN)
+                maxconn=self.config.app_config['db_pool_max'],  # Maximum connections (DB_POOL_MAX)
                 dsn=self.database_url,
                 cursor_factory=psycopg2.extras.RealDictCursor,
                 # Kyma/Kubernetes specifikus beállítások
@@ -197,7 +197,7 @@ class DatabaseManager:
             if conn:
                 self._put_connection(conn, error=error_occurred)
     
-    def execute_batch(self, query: str, data_list: List[tuple]) -> int:
+    def execute_batch(self, query: str, data_list: List[tuple], page_size: int = 1000) -> int:
         """Batch insert optimalizált nagyobb adathalmazokhoz"""
         conn = None
         cursor = None
@@ -212,7 +212,7 @@ class DatabaseManager:
                 cursor, 
                 query, 
                 data_list,
-                page_size=1000  # 1000 record batch-enként
+                page_size=page_size  # page_size record batch-enként (alapértelmezés 1000)
             )
             
             conn.commit()
@@ -239,6 +239,88 @@ class DatabaseManager:
             if conn:
                 self._put_connection(conn, error=error_occurred)
     
+    def execute_values(self, query: str, data_list: List[tuple], template: Optional[str] = None,
+                       page_size: int = 1000, synchronous_commit: bool = True) -> int:
+        """
+        Multi-row VALUES végrehajtás (psycopg2 execute_values) - egy statement page_size soronként
+        
+        synchronous_commit=False: bulk load-hoz a commit nem vár a WAL flush-ra (csak ebben a tranzakcióban)
+        """
+        conn = None
+        cursor = None
+        error_occurred = False
+        
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            
+            if not synchronous_commit:
+                cursor.execute("SET LOCAL synchronous_commit = OFF")
+            
+            # A query egyetlen %s placeholdere helyére kerül a VALUES lista
+            psycopg2.extras.execute_values(
+                cursor,
+                query,
+                data_list,
+                template=template,
+                page_size=page_size
+            )
+            
+            conn.commit()
+            # rowcount csak az utolsó page-et tükrözi, ezért a feldolgozott sorok számát adjuk vissza
+            processed_rows = len(data_list)
+            logger.info(f"Execute values sikeres: {processed_rows} sor feldolgozva")
+            return processed_rows
+            
+        except Exception as e:
+            error_occurred = True
+            logger.error(f"Execute values hiba: {e}")
+            if conn and conn.closed == 0:
+                try:
+                    conn.rollback()
+                except:
+                    pass
+            raise
+            
+        finally:
+            if cursor:
+                try:
+                    cursor.close()
+                except:
+                    pass
+            if conn:
+                self._put_connection(conn, error=error_occurred)
+    
+    def execute_autocommit(self, query: str, params: tuple = None):
+        """
+        Utasítás végrehajtása tranzakción kívül (autocommit) - pl. CREATE/DROP INDEX CONCURRENTLY,
+        ami tranzakció blokkban nem futhat
+        """
+        conn = None
+        error_occurred = False
+        
+        try:
+            conn = self._get_connection()
+            # A pool-ból kapott connection tranzakciója (ping) lezárva, csak utána állítható autocommit
+            conn.rollback()
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(query, params)
+            
+        except Exception as e:
+            error_occurred = True
+            logger.error(f"Autocommit végrehajtás hiba: {e}")
+            raise
+            
+        finally:
+            if conn:
+                if conn.closed == 0:
+                    try:
+                        conn.autocommit = False
+                    except Exception:
+                        error_occurred = True
+                self._put_connection(conn, error=error_occurred)
+    
     def execute_transaction(self, queries: List[tuple]) -> bool:
         """Tranzakció végrehajtása"""
         conn = None
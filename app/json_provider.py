@@ -0,0 +1,25 @@
+import decimal
+from typing import Any
+
+import orjson
+from flask.json.provider import JSONProvider
+
+# Naive datetime -> UTC, nem-string dict kulcsok engedélyezése
+ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj: Any) -> Any:
+    """orjson által natívan nem kezelt típusok (pl. Decimal) konverziója"""
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    return str(obj)
+
+
+class ORJSONProvider(JSONProvider):
+    """orjson alapú JSON provider - gyorsabb jsonify nagy rekordlistákhoz"""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS).decode('utf-8')
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        return orjson.loads(s)
@@ -8,11 +8,15 @@ load_dotenv()
 
 from .config import Config
 from .database import DatabaseManager
+from .json_provider import ORJSONProvider
 
 def create_app() -> Flask:
     """Flask alkalmazás factory"""
     app = Flask(__name__)
 
+    # orjson JSON serializer (requirements.txt-ben rögzített függőség)
+    app.json = ORJSONProvider(app)
+
     # Konfiguráció betöltése
     config = Config()
     app.config.update(config.app_config)
@@ -39,6 +43,14 @@ def create_app() -> Flask:
     app.register_blueprint(import_bp)
     app.register_blueprint(test_bp)
 
+    # Profilozás (csak PROFILE env változóval, productionben soha ne legyen bekapcsolva)
+    if os.getenv('PROFILE', 'False').lower() == 'true':
+        from werkzeug.middleware.profiler import ProfilerMiddleware
+        profile_dir = os.getenv('PROFILE_DIR', './profiles')
+        os.makedirs(profile_dir, exist_ok=True)
+        app.wsgi_app = ProfilerMiddleware(app.wsgi_app, profile_dir=profile_dir, restrictions=[30])
+        logging.warning(f"Werkzeug ProfilerMiddleware bekapcsolva, profilok: {profile_dir}")
+
     # ===== ALAPVETŐ ROUTE-OK =====
 
     @app.route('/')
@@ -76,6 +88,16 @@ def create_app() -> Flask:
                 'error': str(e)
             }), 500
 
+    @app.cli.command('ensure-pagination-indexes')
+    def ensure_pagination_indexes():
+        """(created_at, id) lapozási indexek pótlása meglévő táblákra (CONCURRENTLY, deploy lépés)"""
+        from services.database_service import DatabaseService
+        results = DatabaseService(db_manager).ensure_pagination_indexes()
+        for table, ok in results.items():
+            print(f"{'✅' if ok else '❌'} {table}")
+        if not all(results.values()):
+            raise SystemExit(1)
+
     @app.route('/test-db')
     def test_db():
         """Adatbázis kapcsolat tesztelése"""
@@ -1,6 +1,7 @@
+import os
 import uuid
 from datetime import datetime, timezone
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 class BaseModel:
     """Alapértelmezett model osztály minden adatbázis táblához"""
@@ -10,6 +11,12 @@ class BaseModel:
         """UUID generálása"""
         return str(uuid.uuid4())
     
+    @staticmethod
+    def generate_uuids(n: int) -> List[str]:
+        """n darab UUID generálása egyetlen os.urandom hívással (bulk insert-hez)"""
+        buf = os.urandom(16 * n)
+        return [str(uuid.UUID(bytes=buf[i * 16:(i + 1) * 16], version=4)) for i in range(n)]
+    
     @staticmethod
     def get_current_timestamp() -> datetime:
         """Aktuális időbélyeg lekérése (timezone-aware UTC)"""
@@ -0,0 +1,38 @@
+# Gunicorn konfiguráció - gthread workerek I/O-bound (DB) endpointokhoz
+import os
+
+
+def _container_cpu_count():
+    """Elérhető CPU-k száma: cgroup v2 CPU limit (cpu.max), egyébként a process CPU affinity-je"""
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()
+        if quota != 'max':
+            return max(1, int(quota) // int(period))
+    except (OSError, ValueError):
+        pass
+    return len(os.sched_getaffinity(0))
+
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8080')
+# Konzervatív alapérték: minden worker saját DB pool-t nyit (DB_POOL_MIN..DB_POOL_MAX kapcsolat),
+# ezért max 4 worker, hogy a Neon kapcsolat limit ne teljen be
+workers = int(os.getenv('GUNICORN_WORKERS', min(_container_cpu_count() * 2 + 1, 4)))
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.getenv('GUNICORN_THREADS', '8'))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '120'))
+
+# Preload: az API key tábla és a modulok egyszer töltődnek be, a workerek COW-val osztoznak rajta
+preload_app = True
+
+
+def when_ready(server):
+    """Master: a create_app() által nyitott pool lezárása fork előtt (a workerek ne örököljék a socketeket)"""
+    if server.cfg.preload_app:
+        server.app.wsgi().db_manager.close()
+
+
+def post_fork(server, worker):
+    """Worker: saját connection pool nyitása fork után (preload nélkül a worker maga hívja a create_app()-ot)"""
+    if server.cfg.preload_app:
+        server.app.wsgi().db_manager._initialize_pool()
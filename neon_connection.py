@@ -0,0 +1,19 @@
+"""Közös Neon kapcsolat a batch teszt scriptekhez (test_batch_import.py, test_batch_local.py)"""
+import psycopg2
+
+NEON_CONNECTION_FILE = '/home/fater/btppg-driver-kyma0/Neon_connection_string.txt'
+
+# Connection string egyszer, modul szinten (a fájl lezárva)
+with open(NEON_CONNECTION_FILE) as f:
+    CONN_STRING = f.read().strip()
+
+_conn = None
+
+
+def get_conn():
+    """Egyetlen, újrahasznált kapcsolat - a TLS + startup költség (Neon) csak egyszer"""
+    global _conn
+    if _conn is None or _conn.closed:
+        _conn = psycopg2.connect(CONN_STRING)
+        _conn.set_session(autocommit=False, readonly=False)
+    return _conn
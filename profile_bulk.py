@@ -0,0 +1,45 @@
+import cProfile
+import csv
+import pstats
+import sys
+from datetime import datetime, timezone
+
+from api.routes.test_routes import BULK_CHUNK_SIZE, PRODUCT_COLUMNS, build_product_rows
+from app.models.base import BaseModel
+
+def load_rows(path):
+    """CSV beolvasása csv.reader sorokként + oszlop pozíciók (mint bulk_insert_no_auth)"""
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        rows = list(reader)
+    idx = {name.strip(): i for i, name in enumerate(header)}
+    col_idx = {col: idx.get(col, len(header)) for col in PRODUCT_COLUMNS}
+    return rows, col_idx
+
+def build_all(rows, col_idx, now):
+    """Sor-építés chunk-onként, DB nélkül - csak a CSV -> tuple hot path"""
+    for start in range(0, len(rows), BULK_CHUNK_SIZE):
+        chunk = rows[start:start + BULK_CHUNK_SIZE]
+        ids = BaseModel.generate_uuids(len(chunk))
+        build_product_rows(chunk, col_idx, ids, now, 'profile@noauth.com')
+
+def profile_bulk(path="test_10k_products.csv"):
+    rows, col_idx = load_rows(path)
+    now = datetime.now(timezone.utc)
+    
+    # Bemelegítés: első hívás (import/allokációs költségek) kimarad a mérésből
+    build_all(rows[:1], col_idx, now)
+    
+    profiler = cProfile.Profile()
+    profiler.enable()
+    build_all(rows, col_idx, now)
+    profiler.disable()
+    
+    print(f"📊 {len(rows)} sor profilozva: {path}")
+    pstats.Stats(profiler).sort_stats('cumulative').print_stats(20)
+
+if __name__ == "__main__":
+    # Használat: python profile_bulk.py [csv_path]
+    # Sampling profilerrel: py-spy record -o profile.svg -- python profile_bulk.py test_10k_products.csv
+    profile_bulk(sys.argv[1] if len(sys.argv) > 1 else "test_10k_products.csv")
@@ -1,6 +1,29 @@
 from app.main import create_app
 import os
 
+
+def run_gunicorn(app, host, port):
+    """Alkalmazás indítása Gunicorn alatt (gunicorn.conf.py beállításokkal)"""
+    from gunicorn.app.base import BaseApplication
+
+    class GunicornApplication(BaseApplication):
+        def __init__(self, application, options):
+            self.application = application
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            self.cfg.set('config', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gunicorn.conf.py'))
+            self.load_config_from_file(self.cfg.config)
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return self.application
+
+    GunicornApplication(app, {'bind': f"{host}:{port}"}).run()
+
+
 if __name__ == '__main__':
     app = create_app()
     
@@ -12,4 +35,12 @@ if __name__ == '__main__':
     print(f"📍 URL: http://{host}:{port}")
     print(f"🐛 Debug mód: {debug}")
     
-    app.run(host=host, port=port, debug=debug)
+    if debug:
+        # Werkzeug dev szerver csak debug módban (reloader, debugger)
+        app.run(host=host, port=port, debug=debug)
+    else:
+        try:
+            run_gunicorn(app, host, port)
+        except ImportError:
+            print("⚠️ Gunicorn nem elérhető, Werkzeug dev szerver indítása")
+            app.run(host=host, port=port, debug=debug)
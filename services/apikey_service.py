@@ -18,16 +18,102 @@ Vagy BasicAuthentication használatával:
 """
 
 import os
+import time
+import base64
 import logging
 import hashlib
 import secrets
+from collections import Counter
 from typing import Dict, Optional, List
-from functools import wraps
+from functools import wraps, lru_cache
 from flask import request, jsonify
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Ennél rövidebb kulcs biztosan nem érvényes ({tenant}-{env}-{random} formátum)
+MIN_API_KEY_LENGTH = 20
+
+
+def _is_well_formed_key(api_key: str) -> bool:
+    """Kulcsformátum előszűrés ({tenant}-{env}-{random}): betöltéskor és validáláskor ugyanaz a szabály"""
+    return bool(api_key) and len(api_key) >= MIN_API_KEY_LENGTH and '-' in api_key
+
+
+@lru_cache(maxsize=1024)
+def _hash_api_key(api_key: str) -> str:
+    """SHA-256 hash cache-elve - tenant-enként kevés kulcs, ismételt kéréseknél nincs újra hashelés"""
+    return hashlib.sha256(api_key.encode()).hexdigest()
+
+
+def _build_api_keys() -> Dict[str, Dict]:
+    """
+    API kulcsok betöltése környezeti változókból vagy Secret-ből - egyszer, import időben
+
+    Formátum:
+    API_KEY_<TENANT>_<ENV>=<key_value>
+
+    Példa .env:
+    API_KEY_CUSTOMER1_PROD=cust1-prod-abc123def456ghi789
+    API_KEY_CUSTOMER2_PROD=cust2-prod-xyz987uvw654rst321
+    API_KEY_DEMO_TEST=demo-test-key-for-development
+    """
+    keys = {}
+    rejected = 0
+
+    # Environment alapú konfiguráció
+    for env_var, value in os.environ.items():
+        if env_var.startswith('API_KEY_'):
+            # Parse: API_KEY_CUSTOMER1_PROD -> customer1, prod
+            parts = env_var.replace('API_KEY_', '').lower().split('_')
+            if len(parts) >= 2:
+                tenant = parts[0]
+                environment = '_'.join(parts[1:])
+
+                # Formátumhibás kulcs soha nem authentikálna (validate_api_key előszűrése) -> elutasítjuk
+                if not _is_well_formed_key(value):
+                    logger.error(
+                        "Rejected API key %s: must be at least %d characters and contain '-'",
+                        env_var, MIN_API_KEY_LENGTH
+                    )
+                    rejected += 1
+                    continue
+
+                # Key hash tárolása (security)
+                key_hash = _hash_api_key(value)
+
+                keys[key_hash] = {
+                    'tenant': tenant,
+                    'environment': environment,
+                    'key_preview': value[:8] + '...' + value[-4:],
+                    'created_at': datetime.now().isoformat(),
+                    'active': True
+                }
+
+                logger.info("Loaded API key for tenant: %s, env: %s", tenant, environment)
+
+    # Fallback: demo key teszt környezethez (csak ha egyáltalán nincs kulcs konfigurálva,
+    # elutasított kulcsok mellett nem nyitjuk meg a demo kulcsot)
+    if not keys and not rejected:
+        logger.warning("No API keys configured, using demo key")
+        demo_key = "demo-test-key-for-development-only"
+        demo_hash = _hash_api_key(demo_key)
+        keys[demo_hash] = {
+            'tenant': 'demo',
+            'environment': 'test',
+            'key_preview': 'demo-...only',
+            'created_at': datetime.now().isoformat(),
+            'active': True
+        }
+
+    logger.info("Total API keys loaded: %d", len(keys))
+    return keys
+
+
+# Boot-kor előre kiszámolt hash -> tenant tábla. Gunicorn --preload mellett
+# a fork után minden worker ugyanazt a (copy-on-write) dict-et látja.
+_API_KEYS: Dict[str, Dict] = _build_api_keys()
+
 
 class APIKeyService:
     """
@@ -39,65 +125,18 @@ class APIKeyService:
     3. Bearer token (backward compatibility)
     """
 
-    def __init__(self):
-        self.api_keys = self._load_api_keys()
-        self.key_usage_stats = {}
-
-    def _load_api_keys(self) -> Dict[str, Dict]:
-        """
-        API kulcsok betöltése környezeti változókból vagy Secret-ből
-
-        Formátum:
-        API_KEY_<TENANT>_<ENV>=<key_value>
-
-        Példa .env:
-        API_KEY_CUSTOMER1_PROD=cust1-prod-abc123def456ghi789
-        API_KEY_CUSTOMER2_PROD=cust2-prod-xyz987uvw654rst321
-        API_KEY_DEMO_TEST=demo-test-key-for-development
-        """
-        keys = {}
-
-        # Environment alapú konfiguráció
-        for env_var, value in os.environ.items():
-            if env_var.startswith('API_KEY_'):
-                # Parse: API_KEY_CUSTOMER1_PROD -> customer1, prod
-                parts = env_var.replace('API_KEY_', '').lower().split('_')
-                if len(parts) >= 2:
-                    tenant = parts[0]
-                    environment = '_'.join(parts[1:])
-
-                    # Key hash tárolása (security)
-                    key_hash = self._hash_key(value)
-
-                    keys[key_hash] = {
-                        'tenant': tenant,
-                        'environment': environment,
-                        'key_preview': value[:8] + '...' + value[-4:],
-                        'created_at': datetime.now().isoformat(),
-                        'active': True
-                    }
-
-                    logger.info(f"Loaded API key for tenant: {tenant}, env: {environment}")
-
-        # Fallback: demo key teszt környezethez
-        if not keys:
-            logger.warning("No API keys configured, using demo key")
-            demo_key = "demo-test-key-for-development-only"
-            demo_hash = self._hash_key(demo_key)
-            keys[demo_hash] = {
-                'tenant': 'demo',
-                'environment': 'test',
-                'key_preview': 'demo-...only',
-                'created_at': datetime.now().isoformat(),
-                'active': True
-            }
+    api_keys = _API_KEYS
 
-        logger.info(f"Total API keys loaded: {len(keys)}")
-        return keys
+    def __init__(self):
+        # Hot path tracking: C-szintű számláló + monotonic float, formázás csak lekérdezéskor
+        self.request_counts = Counter()
+        self.first_used = {}
+        self.last_used = {}
+        self._clock_offset = time.time() - time.monotonic()
 
     def _hash_key(self, api_key: str) -> str:
         """API key hashelés (biztonságos tárolás)"""
-        return hashlib.sha256(api_key.encode()).hexdigest()
+        return _hash_api_key(api_key)
 
     def validate_api_key(self, api_key: str) -> Optional[Dict]:
         """
@@ -106,7 +145,9 @@ class APIKeyService:
         Returns:
             Dict with tenant info if valid, None if invalid
         """
-        if not api_key:
+        # Olcsó előszűrés: nyilvánvalóan hibás kulcsokat hashelés nélkül elutasítunk
+        # (a kulcsformátum {tenant}-{env}-{random}, lásd generate_new_api_key)
+        if not _is_well_formed_key(api_key):
             return None
 
         key_hash = self._hash_key(api_key)
@@ -122,7 +163,7 @@ class APIKeyService:
                 'key_hash': key_hash
             }
 
-        logger.warning(f"Invalid API key attempt: {api_key[:8]}...")
+        logger.warning("Invalid API key attempt: %s...", api_key[:8])
         return None
 
     def extract_api_key_from_request(self) -> Optional[str]:
@@ -144,18 +185,19 @@ class APIKeyService:
         auth_header = request.headers.get('Authorization', '')
         if auth_header.startswith('Basic '):
             try:
-                import base64
                 # Basic base64(username:password) -> password az API key
-                credentials = base64.b64decode(auth_header.replace('Basic ', '')).decode('utf-8')
-                username, password = credentials.split(':', 1)
-                logger.debug(f"API Key found in Basic Auth (user: {username})")
-                return password
+                # Slice + bytes partition: nincs str.replace és felesleges decode
+                raw = base64.b64decode(auth_header[6:])
+                username, sep, password = raw.partition(b':')
+                if sep:
+                    logger.debug("API Key found in Basic Auth")
+                    return password.decode('utf-8', 'replace')
             except Exception as e:
-                logger.error(f"Basic Auth parsing error: {e}")
+                logger.error("Basic Auth parsing error: %s", e)
 
         # 3. Bearer token (backward compatibility)
         if auth_header.startswith('Bearer '):
-            token = auth_header.replace('Bearer ', '')
+            token = auth_header[7:]
             # Rövid token = API key, hosszú JWT = OAuth2
             if len(token) < 200:  # API key-k rövidek
                 logger.debug("API Key found in Bearer token")
@@ -165,15 +207,25 @@ class APIKeyService:
 
     def _track_usage(self, key_hash: str):
         """API key használat tracking (rate limiting alapja)"""
-        if key_hash not in self.key_usage_stats:
-            self.key_usage_stats[key_hash] = {
-                'total_requests': 0,
-                'first_used': datetime.now().isoformat(),
-                'last_used': datetime.now().isoformat()
-            }
+        now = time.monotonic()
+        self.request_counts[key_hash] += 1
+        self.first_used.setdefault(key_hash, now)
+        self.last_used[key_hash] = now
 
-        self.key_usage_stats[key_hash]['total_requests'] += 1
-        self.key_usage_stats[key_hash]['last_used'] = datetime.now().isoformat()
+    def _format_timestamp(self, monotonic_ts: float) -> str:
+        """Monotonic időbélyeg ISO formátumra alakítása (csak statisztika lekérdezéskor)"""
+        return datetime.fromtimestamp(monotonic_ts + self._clock_offset).isoformat()
+
+    def _get_key_usage(self, key_hash: str) -> Dict:
+        """Egy API key használati statisztikája"""
+        if key_hash not in self.request_counts:
+            return {}
+
+        return {
+            'total_requests': self.request_counts[key_hash],
+            'first_used': self._format_timestamp(self.first_used[key_hash]),
+            'last_used': self._format_timestamp(self.last_used[key_hash])
+        }
 
     def generate_new_api_key(self, tenant: str, environment: str = 'prod') -> str:
         """
@@ -195,14 +247,14 @@ class APIKeyService:
             'active': True
         }
 
-        logger.info(f"Generated new API key for {tenant}/{environment}")
+        logger.info("Generated new API key for %s/%s", tenant, environment)
         return api_key
 
     def revoke_api_key(self, key_hash: str) -> bool:
         """API key visszavonás"""
         if key_hash in self.api_keys:
             self.api_keys[key_hash]['active'] = False
-            logger.info(f"Revoked API key: {key_hash[:16]}...")
+            logger.info("Revoked API key: %s...", key_hash[:16])
             return True
         return False
 
@@ -220,7 +272,7 @@ class APIKeyService:
                 'key_preview': info['key_preview'],
                 'created_at': info['created_at'],
                 'active': info['active'],
-                'usage': self.key_usage_stats.get(key_hash, {})
+                'usage': self._get_key_usage(key_hash)
             })
 
         return keys
@@ -230,8 +282,8 @@ class APIKeyService:
         return {
             'total_keys': len(self.api_keys),
             'active_keys': sum(1 for k in self.api_keys.values() if k['active']),
-            'total_requests': sum(s['total_requests'] for s in self.key_usage_stats.values()),
-            'keys_usage': self.key_usage_stats
+            'total_requests': sum(self.request_counts.values()),
+            'keys_usage': {key_hash: self._get_key_usage(key_hash) for key_hash in self.request_counts}
         }
 
 
@@ -286,7 +338,7 @@ def require_api_key(f):
         request.environment = validation['environment']
         request.api_key_hash = validation['key_hash']
 
-        logger.info(f"API Key auth successful - Tenant: {request.tenant}, Env: {request.environment}")
+        logger.info("API Key auth successful - Tenant: %s, Env: %s", request.tenant, request.environment)
 
         return f(*args, **kwargs)
 
@@ -316,13 +368,13 @@ def require_flexible_auth(f):
                 return f(*args, **kwargs)
 
         # Fallback OAuth2-re
-        from services.auth_service import OAuth2AuthService
+        from services.auth_service import _AUTH_SERVICE
         auth_header = request.headers.get('Authorization', '')
 
         if auth_header.startswith('Bearer '):
-            token = auth_header.replace('Bearer ', '')
-            oauth_service = OAuth2AuthService()
-            oauth_result = oauth_service.validate_client_credentials_token(token)
+            token = auth_header[7:]
+            # Közös példány: a token cache kérések között megmarad
+            oauth_result = _AUTH_SERVICE.validate_client_credentials_token(token)
 
             if oauth_result.get('valid'):
                 request.tenant = oauth_result['tenant']
@@ -1,18 +1,51 @@
 # services/auth_service.py
 import jwt
+import hashlib
+import threading
+import time
 import requests
+from collections import OrderedDict
 from functools import wraps
 from flask import request, jsonify, current_app
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Validált tokenek LRU cache mérete
+TOKEN_CACHE_MAX_SIZE = 4096
+
 class OAuth2AuthService:
     def __init__(self):
-        self.token_cache = {}
+        # token digest -> (validation result, exp timestamp), LRU sorrendben
+        self.token_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
         
     def validate_client_credentials_token(self, token: str) -> dict:
-        """OAuth2 Client Credentials token validálás"""
+        """OAuth2 Client Credentials token validálás (LRU cache-elve, exp claim-ig)"""
+        cache_key = hashlib.blake2b(token.encode('utf-8'), digest_size=16).digest()
+        
+        with self._cache_lock:
+            cached = self.token_cache.get(cache_key)
+            if cached is not None:
+                result, exp_ts = cached
+                if time.time() <= exp_ts:
+                    self.token_cache.move_to_end(cache_key)
+                    return result
+                # Lejárt token: kidobjuk és újra validáljuk (jwt.decode hibát fog adni)
+                del self.token_cache[cache_key]
+        
+        result, exp_ts = self._decode_token(token)
+        
+        if result['valid']:
+            with self._cache_lock:
+                self.token_cache[cache_key] = (result, exp_ts)
+                if len(self.token_cache) > TOKEN_CACHE_MAX_SIZE:
+                    self.token_cache.popitem(last=False)
+        
+        return result
+    
+    def _decode_token(self, token: str) -> tuple:
+        """JWT decode + validálás, visszaadja az eredményt és az exp időbélyeget"""
         try:
             # JWT decode és validálás
             # Itt a token issuer és audience ellenőrzése történik
@@ -38,16 +71,19 @@ class OAuth2AuthService:
                 'client_id': client_id,
                 'tenant': tenant,
                 'scopes': decoded.get('scope', '').split()
-            }
+            }, decoded.get('exp', float('inf'))
             
         except Exception as e:
             logger.error(f"Token validation error: {e}")
-            return {'valid': False, 'error': str(e)}
+            return {'valid': False, 'error': str(e)}, 0
     
     def _extract_tenant_from_client_id(self, client_id: str) -> str:
         """Client ID-ból tenant azonosítás (pl. customer1-btppg-client)"""
         return client_id.split('-')[0] if '-' in client_id else 'default'
 
+# Process-szintű példány, hogy a token cache kérések között megmaradjon
+_AUTH_SERVICE = OAuth2AuthService()
+
 # Decorator minden API endpoint-hoz
 def require_oauth2_client_credentials(f):
     @wraps(f)
@@ -60,9 +96,8 @@ def require_oauth2_client_credentials(f):
                 'message': 'OAuth2 Client Credentials token required'
             }), 401
             
-        token = auth_header.replace('Bearer ', '')
-        auth_service = OAuth2AuthService()
-        validation_result = auth_service.validate_client_credentials_token(token)
+        token = auth_header[7:]
+        validation_result = _AUTH_SERVICE.validate_client_credentials_token(token)
         
         if not validation_result['valid']:
             return jsonify({
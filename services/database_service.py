@@ -1,10 +1,24 @@
+import hashlib
 import logging
+from datetime import datetime
 from typing import Dict, Any, List, Optional
 from app.database import DatabaseManager
 from app.models.base import BaseModel
 
 logger = logging.getLogger(__name__)
 
+# PostgreSQL azonosító max hossza (NAMEDATALEN - 1); a hosszabb nevet a szerver csonkolja
+PG_MAX_IDENTIFIER_LENGTH = 63
+
+def pagination_index_name(table_name: str) -> str:
+    """(created_at, id) index neve - 63 karakter felett csonkolt táblanév + hash (ütközésmentes)"""
+    name = f"idx_{table_name}_created_at_id"
+    if len(name) <= PG_MAX_IDENTIFIER_LENGTH:
+        return name
+    digest = hashlib.sha1(table_name.encode('utf-8')).hexdigest()[:8]
+    keep = PG_MAX_IDENTIFIER_LENGTH - len("idx___created_at_id") - len(digest)
+    return f"idx_{table_name[:keep]}_{digest}_created_at_id"
+
 class DatabaseService:
     """Adatbázis műveletek szolgáltatás"""
     
@@ -82,12 +96,61 @@ class DatabaseService:
             
             self.db_manager.execute_query(query)
             logger.info(f"Tábla létrehozva: {table_name}")
+
+            # Keyset lapozáshoz (created_at, id) összetett index
+            self.create_pagination_index(table_name)
             return True
             
         except Exception as e:
             logger.error(f"Tábla létrehozási hiba: {e}")
             return False
     
+    def create_pagination_index(self, table_name: str, concurrently: bool = False) -> bool:
+        """
+        (created_at, id) összetett index létrehozása keyset lapozáshoz
+
+        concurrently=True: meglévő (nagy) táblához - CREATE INDEX CONCURRENTLY tranzakción kívül,
+        az írásokat nem blokkolja; egy korábbi megszakadt build INVALID indexét előbb eldobja
+        """
+        index_name = pagination_index_name(table_name)
+        try:
+            if not concurrently:
+                self.db_manager.execute_query(
+                    f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} (created_at DESC, id DESC)"
+                )
+            else:
+                invalid = self.db_manager.execute_query("""
+                    SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+                    WHERE c.relname = %s AND NOT i.indisvalid
+                """, (index_name,))
+                if invalid:
+                    self.db_manager.execute_autocommit(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}")
+                self.db_manager.execute_autocommit(
+                    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} "
+                    f"ON {table_name} (created_at DESC, id DESC)"
+                )
+            logger.info(f"Lapozási index létrehozva: {table_name} ({index_name})")
+            return True
+        except Exception as e:
+            logger.error(f"Lapozási index létrehozási hiba: {e}")
+            return False
+    
+    def ensure_pagination_indexes(self) -> Dict[str, bool]:
+        """
+        Migrációs lépés: lapozási index minden public táblára, amelynek van created_at és id oszlopa
+        (indításkor / deploy-kor futtatandó, nem request-ből - lásd `flask ensure-pagination-indexes`)
+        """
+        query = """
+        SELECT table_name
+        FROM information_schema.columns
+        WHERE table_schema = 'public' AND column_name IN ('created_at', 'id')
+        GROUP BY table_name
+        HAVING COUNT(DISTINCT column_name) = 2
+        ORDER BY table_name
+        """
+        tables = [row['table_name'] for row in self.db_manager.execute_query(query) or []]
+        return {table: self.create_pagination_index(table, concurrently=True) for table in tables}
+    
     def add_column(self, table_name: str, column_name: str, column_type: str) -> bool:
         """Oszlop hozzáadása meglévő táblához"""
         try:
@@ -170,14 +233,27 @@ class DatabaseService:
                    email_filter: Optional[str] = None) -> List[Dict[str, Any]]:
         """Rekordok lekérése szűrési lehetőségekkel"""
         try:
-            query = f"SELECT * FROM {table_name}"
             params = []
+            where_clause = ""
             
             if email_filter:
-                query += " WHERE auth_email = %s"
+                where_clause = " WHERE auth_email = %s"
                 params.append(email_filter)
             
-            query += f" ORDER BY created_at DESC LIMIT %s OFFSET %s"
+            if offset > 0:
+                # Deferred join: az OFFSET csak az id oszlopon lépked (index),
+                # a széles sorokat csak a kiválasztott oldalra olvassuk be
+                query = f"""
+                SELECT t.* FROM {table_name} t
+                JOIN (
+                    SELECT id FROM {table_name}{where_clause}
+                    ORDER BY created_at DESC, id DESC
+                    LIMIT %s OFFSET %s
+                ) o ON t.id = o.id
+                ORDER BY t.created_at DESC, t.id DESC
+                """
+            else:
+                query = f"SELECT * FROM {table_name}{where_clause} ORDER BY created_at DESC, id DESC LIMIT %s OFFSET %s"
             params.extend([limit, offset])
             
             records = self.db_manager.execute_query(query, tuple(params)) or []
@@ -187,6 +263,36 @@ class DatabaseService:
             logger.error(f"Rekord lekérési hiba: {e}")
             return []
     
+    def get_records_after(self, table_name: str, after_ts: Optional[datetime], after_id: Optional[str],
+                          limit: int = 100, email_filter: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Rekordok lekérése keyset (cursor) lapozással - OFFSET scan nélkül"""
+        try:
+            query = f"SELECT * FROM {table_name}"
+            conditions = []
+            params = []
+            
+            if email_filter:
+                conditions.append("auth_email = %s")
+                params.append(email_filter)
+            
+            # Cursor: az előző oldal utolsó rekordja után folytatjuk
+            if after_ts is not None and after_id is not None:
+                conditions.append("(created_at, id) < (%s, %s)")
+                params.extend([after_ts, after_id])
+            
+            if conditions:
+                query += " WHERE " + " AND ".join(conditions)
+            
+            query += " ORDER BY created_at DESC, id DESC LIMIT %s"
+            params.append(limit)
+            
+            records = self.db_manager.execute_query(query, tuple(params)) or []
+            return self._convert_for_json(records)
+            
+        except Exception as e:
+            logger.error(f"Rekord lekérési hiba (cursor): {e}")
+            return []
+    
     def count_records(self, table_name: str, email_filter: Optional[str] = None) -> int:
         """Rekordok számának lekérése"""
         try:
@@ -2,20 +2,44 @@
 
 import logging
 import pandas as pd
-import numpy as np
-import json
-import tempfile
-import os
+import orjson
+import psycopg2
+import io
 import time
-from uuid import uuid4
+import uuid as _uuid_mod
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import IO, Dict, Any, Iterable, List, Optional, Set, Tuple, Union
 from pathlib import Path
 from services.database_service import DatabaseService
 from services.security_service import SecurityService
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:  # opcionális: pandas CSV parser fallback
+    pa = None
+    pacsv = None
+
 logger = logging.getLogger(__name__)
 
+# UUID oszlopban "nincs érték"-ként kezelt jelölők (kisbetűsítve, strip után)
+NULL_UUID_MARKERS = ['nan', '', 'none', 'null', 'na']
+
+# Oszlopnév alapú típus szabályok (sorrend számít: az első találat nyer)
+COL_TYPE_RULES = (
+    ('NUMERIC', ('price', 'cost', 'amount', 'total')),
+    ('INTEGER', ('stock', 'quantity', 'count', 'number')),
+    ('TIMESTAMP', ('date', 'time', 'created', 'updated')),
+    ('VARCHAR(255)', ('email', 'url', 'phone')),
+)
+
+# Adathibák (rossz cast, constraint sértés): ugyanazon sorokkal az execute_batch is elbukna,
+# ezért ilyenkor rögtön a soronkénti fallback jön
+_ROW_DATA_ERRORS = (psycopg2.DataError, psycopg2.IntegrityError)
+
+# Process-szintű security service (a pattern-ek egyszer fordulnak, nem import-onként)
+_SECURITY_SERVICE = SecurityService()
+
 class ImportService:
     """Enhanced Import Service with CSV, Excel, JSON support and PHASE 3 FULL BULK OPTIMIZATIONS"""
 
@@ -24,15 +48,33 @@ class ImportService:
         '.csv': 'csv',
         '.xlsx': 'excel',
         '.xls': 'excel',
+        '.xlsb': 'excel',
         '.json': 'json'
     }
 
+    # Import napló tábla: közös az összes worker process között (BIGSERIAL id = lapozási cursor)
+    IMPORT_LOG_TABLE = 'import_log'
+    _import_log_table_ready = False
+
+    # Excel engine kiterjesztésenként, ha a python-calamine nincs telepítve
+    EXCEL_FALLBACK_ENGINES = {
+        '.xlsx': 'openpyxl',
+        '.xls': 'xlrd',
+        '.xlsb': 'pyxlsb'
+    }
+
+    # CSV rows per read_csv chunk
+    CSV_CHUNK_SIZE = 50_000
+
+    # pyarrow CSV reader block mérete (blokkonként párhuzamos parse)
+    ARROW_CSV_BLOCK_SIZE = 1 << 20
+
     def __init__(self, db_service: DatabaseService):
         self.db_service = db_service
-        self.security_service = SecurityService()
-        self.import_log = []
+        self.security_service = _SECURITY_SERVICE
 
-    def import_file(self, file_content: bytes, filename: str, table_name: str, auth_email: str) -> Dict[str, Any]:
+    def import_file(self, file_content: bytes, filename: str, table_name: str, auth_email: str,
+                    tenant: Optional[str] = None) -> Dict[str, Any]:
         """Universal file import dispatcher"""
         try:
             file_extension = Path(filename).suffix.lower()
@@ -45,28 +87,21 @@ class ImportService:
 
             format_type = self.SUPPORTED_FORMATS[file_extension]
 
-            with tempfile.NamedTemporaryFile(mode='wb', suffix=file_extension, delete=False) as tmp_file:
-                tmp_file.write(file_content)
-                temp_path = tmp_file.name
+            # Memóriabeli buffer: nincs temp fájl írás/visszaolvasás, a parserek file-like objektumot kapnak
+            buf = io.BytesIO(file_content)
 
-            try:
-                if format_type == 'csv':
-                    result = self._import_csv(temp_path, table_name, auth_email)
-                elif format_type == 'excel':
-                    result = self._import_excel(temp_path, table_name, auth_email)
-                elif format_type == 'json':
-                    result = self._import_json(temp_path, table_name, auth_email)
-                else:
-                    result = self._error_response(f"Import handler missing: {format_type}")
-
-                result["source_format"] = format_type
-                return result
+            if format_type == 'csv':
+                result = self._import_csv(buf, table_name, auth_email)
+            elif format_type == 'excel':
+                result = self._import_excel(buf, table_name, auth_email, file_extension)
+            elif format_type == 'json':
+                result = self._import_json(buf, table_name, auth_email)
+            else:
+                result = self._error_response(f"Import handler missing: {format_type}")
 
-            finally:
-                try:
-                    os.unlink(temp_path)
-                except Exception as cleanup_error:
-                    logger.warning(f"Temp file cleanup error: {cleanup_error}")
+            result["source_format"] = format_type
+            self._log_import(filename, table_name, auth_email, result, tenant)
+            return result
 
         except Exception as e:
             logger.error(f"Import file error ({filename}): {e}")
@@ -78,40 +113,99 @@ class ImportService:
         result["source_format"] = "csv"
         return result
 
-    def _import_csv(self, file_path: str, table_name: str, auth_email: str) -> Dict[str, Any]:
-        """CSV file import"""
+    def _import_csv(self, file_or_path: Union[str, IO[bytes]], table_name: str, auth_email: str) -> Dict[str, Any]:
+        """CSV file import (fájl útvonal vagy file-like objektum)"""
         try:
-            logger.info(f"CSV import: {file_path} -> {table_name}")
-            df = pd.read_csv(file_path)
-            return self._process_dataframe_import(df, table_name, auth_email, "CSV")
+            logger.info(f"CSV import: {self._describe_source(file_or_path)} -> {table_name}")
+            # Chunk-onkénti feldolgozás: a DB munka chunk-onként indul
+            chunks = self._read_csv_chunks(file_or_path)
+            return self._process_dataframe_chunks(chunks, table_name, auth_email, "CSV")
         except Exception as e:
             logger.error(f"CSV import error: {e}")
             return self._error_response(f"CSV import error: {str(e)}")
 
-    def _import_excel(self, file_path: str, table_name: str, auth_email: str) -> Dict[str, Any]:
-        """Excel file import"""
+    def _read_csv_chunks(self, file_or_path: Union[str, IO[bytes]]) -> Iterable[pd.DataFrame]:
+        """CSV beolvasás: pyarrow multi-threaded reader, ha elérhető; egyébként pandas chunksize"""
+        if pacsv is not None:
+            try:
+                table = pacsv.read_csv(
+                    file_or_path,
+                    read_options=pacsv.ReadOptions(use_threads=True, block_size=self.ARROW_CSV_BLOCK_SIZE),
+                    # Üres cella -> null (pd.read_csv viselkedés)
+                    convert_options=pacsv.ConvertOptions(strings_can_be_null=True)
+                )
+                return self._arrow_table_chunks(table)
+            except pa.ArrowInvalid as e:
+                logger.warning(f"pyarrow CSV parse failed ({e}), falling back to pandas")
+                if hasattr(file_or_path, 'seek'):
+                    file_or_path.seek(0)
+
+        return pd.read_csv(file_or_path, chunksize=self.CSV_CHUNK_SIZE)
+
+    def _arrow_table_chunks(self, table) -> Iterable[pd.DataFrame]:
+        """Arrow tábla DataFrame chunk-okra bontása, folytonos sorindexszel (sorszámok a warning-okban)"""
+        offset = 0
+        for batch in table.to_batches(max_chunksize=self.CSV_CHUNK_SIZE):
+            df = batch.to_pandas()
+            df.index = pd.RangeIndex(offset, offset + len(df))
+            offset += len(df)
+            yield df
+
+    def _import_excel(self, file_or_path: Union[str, IO[bytes]], table_name: str, auth_email: str,
+                      file_extension: str = '.xlsx') -> Dict[str, Any]:
+        """Excel file import (fájl útvonal vagy file-like objektum)"""
         try:
-            logger.info(f"Excel import: {file_path} -> {table_name}")
+            logger.info(f"Excel import: {self._describe_source(file_or_path)} -> {table_name}")
             try:
-                df = pd.read_excel(file_path, engine='openpyxl')
+                # calamine (Rust) parser: xlsx/xls/xlsb, DOM építés nélkül
+                df = pd.read_excel(file_or_path, engine='calamine')
             except ImportError:
-                return self._error_response("Excel support requires: pip install openpyxl")
+                engine = self._determine_excel_engine(file_extension)
+                logger.warning(f"python-calamine not available, falling back to {engine}")
+                if hasattr(file_or_path, 'seek'):
+                    file_or_path.seek(0)
+                try:
+                    df = pd.read_excel(file_or_path, engine=engine)
+                except ImportError:
+                    return self._error_response(f"Excel support requires: pip install python-calamine (or {engine})")
             return self._process_dataframe_import(df, table_name, auth_email, "Excel")
         except Exception as e:
             logger.error(f"Excel import error: {e}")
             return self._error_response(f"Excel import error: {str(e)}")
 
-    def _import_json(self, file_path: str, table_name: str, auth_email: str) -> Dict[str, Any]:
-        """JSON file import"""
+    def _import_json(self, file_or_path: Union[str, IO[bytes]], table_name: str, auth_email: str) -> Dict[str, Any]:
+        """JSON file import (fájl útvonal vagy file-like objektum)"""
         try:
-            logger.info(f"JSON import: {file_path} -> {table_name}")
-            df = pd.read_json(file_path)
+            logger.info(f"JSON import: {self._describe_source(file_or_path)} -> {table_name}")
+            if isinstance(file_or_path, str):
+                with open(file_or_path, 'rb') as f:
+                    raw = f.read()
+            else:
+                raw = file_or_path.read()
+
+            # orjson (C parser) + from_records: nincs pandas-szintű JSON parse
+            data = orjson.loads(raw)
+            df = pd.DataFrame.from_records(data) if isinstance(data, list) else pd.DataFrame(data)
             return self._process_dataframe_import(df, table_name, auth_email, "JSON")
         except Exception as e:
             logger.error(f"JSON import error: {e}")
             return self._error_response(f"JSON import error: {str(e)}")
 
-    def _process_dataframe_import(self, df: pd.DataFrame, table_name: str, auth_email: str, format_name: str) -> Dict[str, Any]:
+    def _determine_excel_engine(self, file_extension: str) -> str:
+        """Fallback Excel engine kiválasztása kiterjesztés alapján"""
+        return self.EXCEL_FALLBACK_ENGINES.get(file_extension, 'openpyxl')
+
+    @staticmethod
+    def _describe_source(file_or_path: Union[str, IO[bytes]]) -> str:
+        """Import forrás rövid leírása logoláshoz"""
+        if isinstance(file_or_path, str):
+            return file_or_path
+        if isinstance(file_or_path, io.BytesIO):
+            return f"<memory: {file_or_path.getbuffer().nbytes} bytes>"
+        return "<stream>"
+
+    def _process_dataframe_import(self, df: pd.DataFrame, table_name: str, auth_email: str, format_name: str,
+                                  ensure_table: bool = True) -> Dict[str, Any]:
         """Common DataFrame processing logic for all formats"""
         if df.empty:
             return self._error_response(f"The {format_name} file is empty or contains no data")
@@ -119,34 +213,87 @@ class ImportService:
         logger.info(f"{format_name} processing: {len(df)} rows, columns: {list(df.columns)}")
 
         df = self._clean_dataframe_nan_values(df)
-        self._ensure_table_with_columns(table_name, df.columns.tolist(), auth_email)
+        if ensure_table:
+            self._ensure_table_with_columns(table_name, df.columns.tolist(), auth_email)
         
         # PHASE 3 OPTIMIZATION: Use full bulk processing
         return self._process_dataframe_records_phase3_full_bulk(df, table_name, auth_email)
 
+    def _process_dataframe_chunks(self, chunks: Iterable[pd.DataFrame], table_name: str, auth_email: str,
+                                  format_name: str) -> Dict[str, Any]:
+        """Chunk-onkénti DataFrame feldolgozás; tábla/oszlop ellenőrzés csak az első chunk-nál"""
+        results = []
+        for chunk in chunks:
+            if results and chunk.empty:
+                continue
+            result = self._process_dataframe_import(chunk, table_name, auth_email, format_name,
+                                                    ensure_table=not results)
+            if not results and chunk.empty:
+                return result
+            results.append(result)
+
+        if not results:
+            return self._error_response(f"The {format_name} file is empty or contains no data")
+        return self._merge_import_results(results)
+
+    def _merge_import_results(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Chunk eredmények összesítése egyetlen import eredménnyé"""
+        if len(results) == 1:
+            return results[0]
+
+        total_rows = sum(r['total_rows'] for r in results)
+        processed_rows = sum(r['processed_rows'] for r in results)
+        dropped_uuids = [uuid for r in results for uuid in r['dropped_uuids']]
+        warnings = [w for r in results for w in r['warnings']]
+        errors = [e for r in results for e in r['errors']]
+        performances = [r.get('performance', {}) for r in results]
+        execution_time = sum(p.get('execution_time_seconds', 0) for p in performances)
+        insert_count = sum(p.get('bulk_insert_count', 0) for p in performances)
+        update_count = sum(p.get('bulk_update_count', 0) for p in performances)
+
+        # Status determination (same rule as a single-pass import)
+        if processed_rows > 0:
+            status = "success"
+        elif dropped_uuids or warnings:
+            status = "warning"
+        else:
+            status = "error"
+
+        return {
+            "status": status,
+            "total_rows": total_rows,
+            "processed_rows": processed_rows,
+            "skipped_rows": total_rows - processed_rows,
+            "dropped_uuids": dropped_uuids,
+            "warnings": warnings,
+            "errors": errors,
+            "performance": {
+                "execution_time_seconds": round(execution_time, 2),
+                "records_per_second": round(processed_rows / execution_time if execution_time > 0 else 0, 1),
+                "optimization_phase": "phase_3_full_bulk",
+                "chunks": len(results),
+                "uuid_bulk_check_enabled": any(p.get('uuid_bulk_check_enabled') for p in performances),
+                "bulk_insert_count": insert_count,
+                "bulk_update_count": update_count,
+                "bulk_operations_used": (insert_count > 0 or update_count > 0)
+            }
+        }
+
     def _clean_dataframe_nan_values(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Clean DataFrame NaN and empty values in UUID column"""
+        """Clean DataFrame NaN and empty values in UUID column (vectorized)"""
         if 'id' not in df.columns:
             return df
 
-        logger.debug(f"UUID column before cleaning: {df['id'].tolist()}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"UUID column before cleaning: {df['id'].tolist()}")
 
-        df['id'] = df['id'].replace('nan', None)
-        df['id'] = df['id'].replace({np.nan: None})
-        df['id'] = df['id'].where(df['id'].notna(), None)
+        # Egyetlen oszlopszintű lépés: string + strip, "üres" jelölők és NaN -> None
+        ids = df['id'].astype('string').str.strip()
+        bad = ids.isna() | ids.str.lower().isin(NULL_UUID_MARKERS)
+        df['id'] = ids.astype(object).mask(bad, None)
 
-        def normalize_uuid_value(value):
-            if pd.isna(value) or value is None:
-                return None
-            str_value = str(value).strip().lower()
-            if str_value in ['nan', '', 'none', 'null', 'na']:
-                return None
-            if not str_value:
-                return None
-            return str(value).strip() if str(value).strip() else None
-
-        df['id'] = df['id'].apply(normalize_uuid_value)
-        logger.debug(f"UUID column after cleaning: {df['id'].tolist()}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"UUID column after cleaning: {df['id'].tolist()}")
         return df
 
     def _ensure_table_with_columns(self, table_name: str, columns: List[str], auth_email: str):
@@ -178,16 +325,10 @@ class ImportService:
     def _determine_column_type(self, column_name: str) -> str:
         """Determine column type based on name"""
         column_lower = column_name.lower()
-        if any(keyword in column_lower for keyword in ['price', 'cost', 'amount', 'total']):
-            return 'NUMERIC'
-        elif any(keyword in column_lower for keyword in ['stock', 'quantity', 'count', 'number']):
-            return 'INTEGER'
-        elif any(keyword in column_lower for keyword in ['date', 'time', 'created', 'updated']):
-            return 'TIMESTAMP'
-        elif any(keyword in column_lower for keyword in ['email', 'url', 'phone']):
-            return 'VARCHAR(255)'
-        else:
-            return 'TEXT'
+        for column_type, keywords in COL_TYPE_RULES:
+            if any(keyword in column_lower for keyword in keywords):
+                return column_type
+        return 'TEXT'
 
     def _process_dataframe_records_phase3_full_bulk(self, df: pd.DataFrame, table_name: str, auth_email: str) -> Dict[str, Any]:
         """
@@ -201,46 +342,48 @@ class ImportService:
         logger.info(f"PHASE 3: Starting full bulk operations for {total_rows} records")
 
         # PHASE 1: Bulk UUID existence check
-        uuid_existence_map = {}
+        existing_uuids: Set[str] = set()
         if has_uuid_column:
-            uuid_existence_map = self._bulk_uuid_existence_check(df, table_name)
+            existing_uuids = self._bulk_uuid_existence_check(df, table_name)
 
         # PHASE 2 & 3: Separate records into batches
-        insert_records = []
-        update_records = []
         dropped_uuids = []
         warnings = []
         errors = []
 
-        for index, row in df.iterrows():
-            try:
-                row_data = row.to_dict()
-                uuid_action = self._determine_uuid_action_with_bulk_lookup(
-                    row_data, table_name, has_uuid_column, uuid_existence_map
-                )
-
-                if uuid_action['action'] == 'drop':
-                    dropped_uuids.append(uuid_action['uuid'])
-                    warnings.append(f"Row {index + 1}: UUID not found in database, dropped")
-                elif uuid_action['action'] == 'insert':
-                    insert_data = self._prepare_insert_data(row_data)
-                    if insert_data:
-                        insert_records.append({'data': insert_data, 'row_index': index})
-                    else:
-                        warnings.append(f"Row {index + 1}: No valid data to insert")
-                elif uuid_action['action'] == 'update':
-                    update_data = self._prepare_update_data(row_data)
-                    if update_data:
-                        update_records.append({
-                            'uuid': uuid_action['uuid'],
-                            'data': update_data,
-                            'row_index': index
-                        })
-                    else:
-                        warnings.append(f"Row {index + 1}: No valid data to update")
-            except Exception as e:
-                logger.error(f"Row processing error (index: {index}): {e}")
-                errors.append(f"Row {index + 1}: Processing error - {str(e)}")
+        # Vektorizált UUID akció meghatározás: insert / update / drop maszkok a teljes id oszlopra
+        insert_mask, update_mask, drop_mask = self._determine_uuid_actions_vectorized(
+            df, table_name, has_uuid_column, existing_uuids
+        )
+
+        if drop_mask.any():
+            dropped_uuids = df.loc[drop_mask, 'id'].tolist()
+            warnings.extend(f"Row {index + 1}: UUID not found in database, dropped"
+                            for index in df.index[drop_mask])
+
+        # Oszloponkénti előkészítés (id nélkül, security mask, NaN -> None), majd batch materializálás
+        # (_frame_records); None érték = nincs adat (UPDATE-nél COALESCE megtartja)
+        insert_frame = self._prepare_frame(df.loc[insert_mask])
+        insert_has_data = insert_frame.notna().any(axis=1)
+        warnings.extend(f"Row {index + 1}: No valid data to insert"
+                        for index in insert_frame.index[~insert_has_data])
+        insert_records = [
+            {'data': row_data, 'row_index': index}
+            for index, row_data in zip(insert_frame.index[insert_has_data],
+                                       self._frame_records(insert_frame.loc[insert_has_data]))
+        ]
+
+        update_frame = self._prepare_frame(df.loc[update_mask])
+        update_has_data = update_frame.notna().any(axis=1)
+        warnings.extend(f"Row {index + 1}: No valid data to update"
+                        for index in update_frame.index[~update_has_data])
+        update_uuids = df.loc[update_mask, 'id'].astype(str).str.strip() if update_mask.any() else pd.Series(dtype=str)
+        update_records = [
+            {'uuid': uuid_str, 'data': row_data, 'row_index': index}
+            for index, uuid_str, row_data in zip(update_frame.index[update_has_data],
+                                                 update_uuids[update_has_data],
+                                                 self._frame_records(update_frame.loc[update_has_data]))
+        ]
 
         # PHASE 2: Execute bulk INSERT
         insert_success_count = 0
@@ -284,36 +427,35 @@ class ImportService:
                 "execution_time_seconds": round(execution_time, 2),
                 "records_per_second": round(processed_rows / execution_time if execution_time > 0 else 0, 1),
                 "optimization_phase": "phase_3_full_bulk",
-                "uuid_bulk_check_enabled": len(uuid_existence_map) > 0,
+                "uuid_bulk_check_enabled": has_uuid_column,
                 "bulk_insert_count": insert_success_count,
                 "bulk_update_count": update_success_count,
                 "bulk_operations_used": (insert_success_count > 0 or update_success_count > 0)
             }
         }
 
-    def _bulk_uuid_existence_check(self, df: pd.DataFrame, table_name: str) -> Dict[str, bool]:
-        """PHASE 1: Bulk UUID existence check"""
+    def _bulk_uuid_existence_check(self, df: pd.DataFrame, table_name: str) -> Set[str]:
+        """
+        PHASE 1: Bulk UUID existence check - a létező UUID-k halmaza
+
+        Invariáns: minden formailag érvényes UUID bekerül a lekérdezésbe, így az eredmény
+        authoritative - ami érvényes, de nincs a halmazban, az nem létezik a táblában.
+        """
         logger.info("PHASE 1: Starting bulk UUID existence check...")
-        uuid_existence_map = {}
+        existing_uuids: Set[str] = set()
 
-        valid_uuids = []
-        for uuid_val in df['id']:
-            if pd.notna(uuid_val):
-                uuid_str = str(uuid_val).strip()
-                if self._is_valid_uuid_format(uuid_str):
-                    valid_uuids.append(uuid_str)
+        # Egyedi értékekre validálunk: ismétlődő UUID-k csak egyszer
+        unique_ids = set(df['id'].dropna().astype(str).str.strip())
+        valid_uuids = [uuid_str for uuid_str in unique_ids if self._is_valid_uuid_format(uuid_str)]
 
         if valid_uuids:
             uuid_check_start = time.time()
             try:
-                placeholders = ','.join(['%s'] * len(valid_uuids))
-                check_query = f"SELECT id FROM {table_name} WHERE id IN ({placeholders})"
+                # Egyetlen tömb paraméter: bármekkora N-re egy statement (nincs 32767 paraméter limit)
+                check_query = f"SELECT id FROM {table_name} WHERE id = ANY(%s::uuid[])"
 
-                existing_records = self.db_service.db_manager.execute_query(check_query, valid_uuids)
-                existing_uuids = {record['id'] for record in existing_records} if existing_records else set()
-
-                for uuid in valid_uuids:
-                    uuid_existence_map[uuid] = uuid in existing_uuids
+                existing_records = self.db_service.db_manager.execute_query(check_query, (valid_uuids,))
+                existing_uuids = {str(record['id']) for record in existing_records} if existing_records else set()
 
                 uuid_check_time = time.time() - uuid_check_start
                 logger.info(f"PHASE 1: Bulk UUID check completed in {uuid_check_time:.2f}s")
@@ -321,66 +463,59 @@ class ImportService:
 
             except Exception as e:
                 logger.error(f"Bulk UUID check failed: {e}, falling back to individual checks")
-                uuid_existence_map = {}
+                existing_uuids = {uuid_str for uuid_str in valid_uuids
+                                  if self._uuid_exists_in_table(table_name, uuid_str)}
 
-        return uuid_existence_map
+        return existing_uuids
 
     def _execute_bulk_insert_phase2(self, table_name: str, insert_records: List[Dict], auth_email: str) -> int:
-        """PHASE 2: Execute bulk INSERT using VALUES clause"""
+        """PHASE 2: Execute bulk INSERT using execute_values (multi-row VALUES, C-level mogrify)"""
         if not insert_records:
             return 0
 
         try:
             current_time = datetime.now()
 
-            # Determine columns from first record
-            sample_data = insert_records[0]['data']
-            data_columns = list(sample_data.keys())
-            all_columns = ['id'] + data_columns + ['created_at', 'updated_at', 'auth_email']
-
-            # Build VALUES clause for bulk INSERT
-            values_parts = []
-            params = []
+            # Columns across all records (a row may lack a key whose cell was NaN)
+            data_columns = list(dict.fromkeys(col for record in insert_records for col in record['data']))
+            # Insert rekordoknak nincs megadott id-ja: az id oszlop kimarad, a gen_random_uuid() DEFAULT tölti
+            all_columns = data_columns + ['created_at', 'updated_at', 'auth_email']
 
-            for record in insert_records:
-                # ID (auto-generated)
-                params.append(str(uuid4()))
-
-                # Data columns
-                for col in data_columns:
-                    value = record['data'].get(col)
-                    params.append(value if value is not None else None)
-
-                # Audit columns
-                params.extend([current_time, current_time, auth_email])
+            rows = [
+                (*[record['data'].get(col) for col in data_columns],
+                 current_time, current_time, auth_email)
+                for record in insert_records
+            ]
 
-                # Create placeholder
-                placeholders = ','.join(['%s'] * len(all_columns))
-                values_parts.append(f"({placeholders})")
-
-            # Build and execute bulk INSERT
-            columns_clause = ','.join(all_columns)
-            values_clause = ','.join(values_parts)
-
-            insert_sql = f"""
-                INSERT INTO {table_name} ({columns_clause})
-                VALUES {values_clause}
-            """
+            insert_sql = f"INSERT INTO {table_name} ({','.join(all_columns)}) VALUES %s"
 
             logger.debug(f"Bulk INSERT SQL: {len(insert_records)} records")
-            self.db_service.db_manager.execute_query(insert_sql, params, fetch=False)
+            self.db_service.db_manager.execute_values(insert_sql, rows, page_size=1000,
+                                                      synchronous_commit=False)
 
             return len(insert_records)
 
         except Exception as e:
             logger.error(f"Bulk INSERT failed: {e}")
 
-            # Fallback to individual inserts
+            # Fallback 1: execute_batch (page_size statement / round-trip) - csak nem-adat hibánál
+            # (üzenetméret, OperationalError); adathibánál ugyanazon sorokkal ez is elbukna
+            if not isinstance(e, _ROW_DATA_ERRORS):
+                batch_count = self._execute_batch_insert_fallback(table_name, insert_records, auth_email)
+                if batch_count is not None:
+                    return batch_count
+
+            # Fallback 2: individual inserts (a hibás sor nem buktatja a többit)
             logger.info("Falling back to individual INSERT operations")
             success_count = 0
             for record in insert_records:
                 try:
-                    result_uuid = self.db_service.insert_record(table_name, record['data'], auth_email)
+                    # NaN cellák (None) kimaradnak: az oszlop DEFAULT-ja érvényesül, mint a ritka dict-eknél
+                    result_uuid = self.db_service.insert_record(
+                        table_name,
+                        {key: value for key, value in record['data'].items() if value is not None},
+                        auth_email
+                    )
                     if result_uuid:
                         success_count += 1
                 except Exception as individual_error:
@@ -390,8 +525,8 @@ class ImportService:
 
     def _execute_bulk_update_phase3(self, table_name: str, update_records: List[Dict], auth_email: str) -> int:
         """
-        PHASE 3: Execute bulk UPDATE using CASE statements
-        Sokkal gyorsabb mint egyenként UPDATE-elni
+        PHASE 3: Execute bulk UPDATE using UPDATE ... FROM (VALUES ...) join
+        Egy scan + hash join, SQL méret O(sorok + oszlopok) a CASE-es O(sorok * oszlopok) helyett
         """
         if not update_records:
             return 0
@@ -406,61 +541,55 @@ class ImportService:
 
             all_data_columns = sorted(list(all_data_columns))
 
-            # Build CASE statements for each column
-            set_clauses = []
-            params = []
-
-            for column in all_data_columns:
-                case_parts = []
-                for record in update_records:
-                    if column in record['data']:
-                        case_parts.append("WHEN id = %s THEN %s")
-                        params.extend([record['uuid'], record['data'][column]])
-
-                if case_parts:
-                    case_stmt = f"""
-                        {column} = CASE
-                            {' '.join(case_parts)}
-                            ELSE {column}
-                        END
-                    """
-                    set_clauses.append(case_stmt)
-
-            # Add audit column updates
-            set_clauses.append("updated_at = %s")
-            set_clauses.append("auth_email = %s")
-            params.extend([current_time, auth_email])
-
-            # WHERE clause with all UUIDs
-            update_uuids = [record['uuid'] for record in update_records]
-            where_placeholders = ','.join(['%s'] * len(update_uuids))
-            params.extend(update_uuids)
-
-            # Build and execute bulk UPDATE
-            set_clause = ', '.join(set_clauses)
+            # One VALUES row per record; missing keys -> NULL, COALESCE keeps the current value
+            rows = [
+                (record['uuid'], *[record['data'].get(column) for column in all_data_columns],
+                 current_time, auth_email)
+                for record in update_records
+            ]
+
+            # Explicit casts per VALUES cell, so literal types match the target columns
+            column_types = self._get_column_types(table_name)
+            value_columns = all_data_columns + ['updated_at', 'auth_email']
+            template = "(%s::uuid, " + ", ".join(
+                self._cast_placeholder(column_types.get(column)) for column in value_columns
+            ) + ")"
+
+            set_clause = ", ".join(
+                [f"{column} = COALESCE(v.{column}, t.{column})" for column in all_data_columns] +
+                ["updated_at = v.updated_at", "auth_email = v.auth_email"]
+            )
             update_sql = f"""
-                UPDATE {table_name} 
+                UPDATE {table_name} AS t
                 SET {set_clause}
-                WHERE id IN ({where_placeholders})
+                FROM (VALUES %s) AS v(id, {", ".join(value_columns)})
+                WHERE t.id = v.id
             """
 
             logger.debug(f"Bulk UPDATE SQL: {len(update_records)} records")
-            self.db_service.db_manager.execute_query(update_sql, params, fetch=False)
+            self.db_service.db_manager.execute_values(update_sql, rows, template=template, page_size=1000)
 
             return len(update_records)
 
         except Exception as e:
             logger.error(f"Bulk UPDATE failed: {e}")
 
-            # Fallback to individual updates
+            # Fallback 1: execute_batch (page_size statement / round-trip) - csak nem-adat hibánál
+            # (üzenetméret, OperationalError); adathibánál ugyanazon sorokkal ez is elbukna
+            if not isinstance(e, _ROW_DATA_ERRORS):
+                batch_count = self._execute_batch_update_fallback(table_name, update_records, auth_email)
+                if batch_count is not None:
+                    return batch_count
+
+            # Fallback 2: individual updates (a hibás sor nem buktatja a többit)
             logger.info("Falling back to individual UPDATE operations")
             success_count = 0
             for record in update_records:
                 try:
                     success = self.db_service.update_record(
                         table_name,
-                        record['uuid'], 
-                        record['data'],
+                        record['uuid'],
+                        {key: value for key, value in record['data'].items() if value is not None},
                         auth_email
                     )
                     if success:
@@ -470,35 +599,102 @@ class ImportService:
 
             return success_count
 
-    def _determine_uuid_action_with_bulk_lookup(self, row_data: Dict[str, Any], table_name: str,
-                                               has_uuid_column: bool, uuid_existence_map: Dict[str, bool]) -> Dict[str, Any]:
-        """Enhanced UUID action determination with bulk lookup"""
-        if not has_uuid_column or not row_data.get('id'):
-            return {'action': 'insert', 'uuid': None, 'reason': 'No UUID provided - will auto-generate'}
+    def _execute_batch_insert_fallback(self, table_name: str, insert_records: List[Dict], auth_email: str) -> Optional[int]:
+        """INSERT fallback execute_batch-csel; None, ha ez is sikertelen"""
+        logger.info("Falling back to batched INSERT operations (execute_batch)")
+        try:
+            current_time = datetime.now()
+            data_columns = list(dict.fromkeys(col for record in insert_records for col in record['data']))
+            all_columns = data_columns + ['created_at', 'updated_at', 'auth_email']
+
+            rows = [
+                (*[record['data'].get(col) for col in data_columns],
+                 current_time, current_time, auth_email)
+                for record in insert_records
+            ]
+
+            placeholders = ','.join(['%s'] * len(all_columns))
+            insert_sql = f"INSERT INTO {table_name} ({','.join(all_columns)}) VALUES ({placeholders})"
+            self.db_service.db_manager.execute_batch(insert_sql, rows, page_size=100)
+            return len(insert_records)
 
-        provided_uuid = str(row_data['id']).strip()
+        except Exception as e:
+            logger.error(f"Batched INSERT also failed: {e}")
+            return None
 
-        if not self._is_valid_uuid_format(provided_uuid):
-            return {'action': 'drop', 'uuid': provided_uuid, 'reason': 'Invalid UUID format'}
+    def _execute_batch_update_fallback(self, table_name: str, update_records: List[Dict], auth_email: str) -> Optional[int]:
+        """UPDATE fallback execute_batch-csel; None, ha ez is sikertelen"""
+        logger.info("Falling back to batched UPDATE operations (execute_batch)")
+        try:
+            current_time = datetime.now()
+            all_data_columns = sorted({col for record in update_records for col in record['data']})
+
+            # Hiányzó kulcs -> NULL, COALESCE megtartja a jelenlegi értéket (mint a bulk UPDATE-nél)
+            rows = [
+                (*[record['data'].get(column) for column in all_data_columns],
+                 current_time, auth_email, record['uuid'])
+                for record in update_records
+            ]
+
+            set_clause = ", ".join(
+                [f"{column} = COALESCE(%s, {column})" for column in all_data_columns] +
+                ["updated_at = %s", "auth_email = %s"]
+            )
+            update_sql = f"UPDATE {table_name} SET {set_clause} WHERE id = %s"
+            self.db_service.db_manager.execute_batch(update_sql, rows, page_size=100)
+            return len(update_records)
 
-        # Fast lookup using pre-computed map
-        if provided_uuid in uuid_existence_map:
-            if uuid_existence_map[provided_uuid]:
-                return {'action': 'update', 'uuid': provided_uuid, 'reason': 'UUID exists - will update record'}
-            else:
-                return {'action': 'drop', 'uuid': provided_uuid, 'reason': 'UUID not found in database'}
-        else:
-            # Fallback to individual check
-            if self._uuid_exists_in_table(table_name, provided_uuid):
-                return {'action': 'update', 'uuid': provided_uuid, 'reason': 'UUID exists - will update record (individual check)'}
-            else:
-                return {'action': 'drop', 'uuid': provided_uuid, 'reason': 'UUID not found in database (individual check)'}
+        except Exception as e:
+            logger.error(f"Batched UPDATE also failed: {e}")
+            return None
+
+    def _get_column_types(self, table_name: str) -> Dict[str, str]:
+        """Oszlop -> Postgres adattípus (information_schema) a VALUES cast-okhoz"""
+        schema = self.db_service.get_table_schema(table_name)
+        return {col['column_name']: col['data_type'] for col in schema}
+
+    def _cast_placeholder(self, data_type: Optional[str]) -> str:
+        """VALUES placeholder explicit cast-tal, ha a típus ismert és beépített"""
+        if not data_type or data_type in ('USER-DEFINED', 'ARRAY'):
+            return "%s"
+        return f"%s::{data_type}"
+
+    def _determine_uuid_actions_vectorized(self, df: pd.DataFrame, table_name: str, has_uuid_column: bool,
+                                           existing_uuids: Set[str]) -> Tuple[pd.Series, pd.Series, pd.Series]:
+        """
+        UUID akció meghatározás a teljes id oszlopra egyszerre (soronkénti dispatch helyett)
+
+        Returns:
+            (insert_mask, update_mask, drop_mask) boolean Series-ek a df indexén
+        """
+        if not has_uuid_column:
+            all_rows = pd.Series(True, index=df.index)
+            no_rows = pd.Series(False, index=df.index)
+            return all_rows, no_rows, no_rows.copy()
+
+        ids = df['id']
+        stripped = ids.astype(str).str.strip()
+        # Nincs UUID -> insert (auto-generált id)
+        has_id = ids.notna() & (stripped != '')
+
+        # Formátum validálás csak egyedi értékekre, majd map a teljes oszlopra
+        validity = {uuid_str: self._is_valid_uuid_format(uuid_str) for uuid_str in stripped[has_id].unique()}
+        # eq(True): a nem szereplő (NaN) érték False, object -> bool downcast (fillna FutureWarning) nélkül
+        valid_mask = has_id & stripped.map(validity).eq(True)
+
+        # A bulk check eredménye authoritative (lásd _bulk_uuid_existence_check): nincs egyedi lekérdezés,
+        # egyetlen halmaz-tagság vizsgálat - ami nincs benne, az drop
+        exists_mask = valid_mask & stripped.isin(existing_uuids)
+
+        insert_mask = ~has_id
+        update_mask = exists_mask
+        drop_mask = has_id & ~exists_mask
+        return insert_mask, update_mask, drop_mask
 
     def _is_valid_uuid_format(self, uuid_string: str) -> bool:
         """UUID format validation"""
-        import uuid as uuid_module
         try:
-            uuid_module.UUID(uuid_string)
+            _uuid_mod.UUID(uuid_string)
             return True
         except (ValueError, AttributeError, TypeError):
             return False
@@ -513,22 +709,84 @@ class ImportService:
             logger.error(f"UUID existence check error ({table_name}/{uuid}): {e}")
             return False
 
-    def _prepare_insert_data(self, row_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Prepare data for insert"""
-        clean_data = {}
-        for key, value in row_data.items():
-            if key.lower() == 'id':
-                continue
-            if pd.notna(value) and value is not None:
-                if self.security_service.is_safe_value(key, str(value)):
-                    clean_data[key] = value
-                else:
-                    logger.warning(f"Security check failed: {key}={value}")
-        return clean_data
-
-    def _prepare_update_data(self, row_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Prepare data for update"""
-        return self._prepare_insert_data(row_data)
+    def _prepare_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Insert/update adatok előkészítése oszloponként: id oszlop nélkül, security check
+        (SecurityService.is_safe_series), a nem biztonságos és NaN cellák -> None
+        """
+        frame = df.drop(columns=[col for col in df.columns if str(col).lower() == 'id'])
+        if frame.empty or len(frame.columns) == 0:
+            return frame
+
+        safe = pd.concat(
+            [self.security_service.is_safe_series(str(col), frame[col]) for col in frame.columns], axis=1
+        )
+        safe.columns = frame.columns
+        unsafe_count = int((~safe).to_numpy().sum())
+        if unsafe_count:
+            logger.warning(f"Security check failed for {unsafe_count} cell(s), values skipped")
+
+        frame = frame.astype(object)
+        return frame.where(safe & frame.notna(), None)
+
+    @staticmethod
+    def _frame_records(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+        """
+        Rekord dict-ek egy (object dtype) DataFrame-ből: egyetlen to_numpy() tömb + dict(zip()),
+        to_dict('records') cellánkénti boxing-ja nélkül
+        """
+        columns = frame.columns.tolist()
+        return [dict(zip(columns, values)) for values in frame.to_numpy().tolist()]
+
+    def _ensure_import_log_table(self):
+        """Import napló tábla + (tenant, id DESC) index létrehozása - processzenként egyszer"""
+        if ImportService._import_log_table_ready:
+            return
+        self.db_service.db_manager.execute_query(f"""
+            CREATE TABLE IF NOT EXISTS {self.IMPORT_LOG_TABLE} (
+                id BIGSERIAL PRIMARY KEY,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                tenant VARCHAR(255),
+                filename TEXT,
+                table_name VARCHAR(100),
+                auth_email VARCHAR(255),
+                status VARCHAR(20),
+                source_format VARCHAR(20),
+                total_rows INTEGER DEFAULT 0,
+                processed_rows INTEGER DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS idx_{self.IMPORT_LOG_TABLE}_tenant_id
+                ON {self.IMPORT_LOG_TABLE} (tenant, id DESC)
+        """)
+        ImportService._import_log_table_ready = True
+
+    def _log_import(self, filename: str, table_name: str, auth_email: str, result: Dict[str, Any],
+                    tenant: Optional[str] = None):
+        """Import eredmény naplózása az import_log táblába (hiba esetén az import eredménye nem változik)"""
+        try:
+            self._ensure_import_log_table()
+            self.db_service.db_manager.execute_query(
+                f"INSERT INTO {self.IMPORT_LOG_TABLE} "
+                "(tenant, filename, table_name, auth_email, status, source_format, total_rows, processed_rows) "
+                "VALUES (%s, %s, %s, %s, %s, %s, %s, %s)",
+                (tenant, filename, table_name, auth_email, result.get('status'), result.get('source_format'),
+                 result.get('total_rows', 0), result.get('processed_rows', 0))
+            )
+        except Exception as e:
+            logger.warning(f"Import napló írási hiba ({filename}): {e}")
+
+    def get_import_log(self, tenant: str, limit: int = 100, after_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Tenant import naplója keyset lapozással (id DESC, csak az after_id-nél régebbiek)"""
+        self._ensure_import_log_table()
+        query = f"SELECT * FROM {self.IMPORT_LOG_TABLE} WHERE tenant = %s"
+        params: List[Any] = [tenant]
+        if after_id is not None:
+            query += " AND id < %s"
+            params.append(after_id)
+        query += " ORDER BY id DESC LIMIT %s"
+        params.append(limit)
+        records = self.db_service.db_manager.execute_query(query, tuple(params)) or []
+        return self.db_service._convert_for_json(records)
 
     def _error_response(self, message: str) -> Dict[str, Any]:
         """Standard error response"""
@@ -1,29 +1,86 @@
 import logging
 import re
+import itertools
+import time
+import pandas as pd
+from collections import deque
+from functools import lru_cache
 from typing import Dict, Any, List, Tuple, Optional
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Előre fordított validációs minták (modul szinten, egyszer)
+_TABLE_NAME_RE = re.compile(r'^[a-zA-Z_][a-zA-Z0-9_]*$')
+_EMAIL_RE = re.compile(r'^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}$')
+
+# Megőrzött biztonsági események maximális száma (a legrégebbiek kiesnek)
+SECURITY_LOG_MAX_EVENTS = 10000
+
+
+@lru_cache(maxsize=256)
+def _is_valid_table_name(table_name: str) -> bool:
+    """Tábla név validálás - tiszta függvény, ezért cache-elhető"""
+    if not table_name or len(table_name) > 100:
+        return False
+    return bool(_TABLE_NAME_RE.match(table_name))
+
 class SecurityService:
     """Teljes biztonsági szolgáltatás SQL injection és egyéb támadások ellen"""
     
     def __init__(self):
-        self.blocked_attempts = []
-        self.security_events = []
+        # Korlátos napló: O(1) append, memória nem nő támadás alatt sem
+        self.blocked_attempts = deque(maxlen=SECURITY_LOG_MAX_EVENTS)
+        self.security_events = deque(maxlen=SECURITY_LOG_MAX_EVENTS)
+        # (ezredmásodperc bucket, ISO string): egy ms-on belüli események közös timestamp stringje
+        self._ts_cache = (0, '')
         self.setup_patterns()
     
     def setup_patterns(self):
         """Biztonsági minták beállítása - OPTIMALIZÁLT BATCH IMPORTHOZ"""
         # Csak kritikus SQL injection minták (parameterized queries védik az adatokat)
+        # Előre fordítva (re.Pattern), a hot path-on nincs re modul cache lookup
         self.sql_patterns = [
-            (r';\s*(DROP|DELETE|TRUNCATE|ALTER)\s+TABLE\b', 'DROP_TABLE'),  # Statement végén
-            (r';\s*UNION(\s+ALL)?\s+SELECT\b', 'UNION_SELECT'),  # Statement végén
-            (r';\s*--', 'SQL_COMMENT'),  # SQL comment csak statement után
+            (re.compile(pattern, re.IGNORECASE), name) for pattern, name in [
+                (r';\s*(?:DROP|DELETE|TRUNCATE|ALTER)\s+TABLE\b', 'DROP_TABLE'),  # Statement végén
+                (r';\s*UNION(?:\s+ALL)?\s+SELECT\b', 'UNION_SELECT'),  # Statement végén
+                (r';\s*--', 'SQL_COMMENT'),  # SQL comment csak statement után
+            ]
         ]
 
+        # SQL minták egyetlen alternációként, named group-okkal: egy scan, m.lastgroup = minta neve
+        self._sql_union = re.compile(
+            '|'.join(f'(?P<{name}>{pattern.pattern})' for pattern, name in self.sql_patterns),
+            re.IGNORECASE
+        )
+
+        # UPDATE statement minta (csak kritikus mezőknél)
+        self._update_re = re.compile(r'\bupdate\s+\w+\s+set\b', re.IGNORECASE)
+
+        # Substring minták: gyors check (normál mezők) és teljes check (kritikus mezők)
+        self.critical_patterns = ['<script', 'javascript:', '; drop table', '; delete from', '; truncate']
+        self.dangerous_patterns = ['<script', 'javascript:', '; drop table', '; delete from', 'exec(', 'eval(']
+
         # Kritikus mezők, ahol teljes validáció szükséges
-        self.critical_fields = {'query', 'sql', 'command', 'script', 'code'}
+        self.critical_fields = frozenset({'query', 'sql', 'command', 'script', 'code'})
+
+        # Szám-szerű értékek karakterkészlete ("12.99", "-3", "1e5"): egyik minta sem illeszkedhet rájuk
+        self._safe_chars = frozenset('0123456789.-eE ')
+
+        # Ennél rövidebb érték egyik gyors check mintát sem tartalmazhatja
+        self._quick_min_len = min(len(p) for p in self.critical_patterns)
+
+        # Substring listák egyetlen case-insensitive union regex-ként: egy scan, nincs value.lower() másolat
+        self._quick_re = re.compile('|'.join(map(re.escape, self.critical_patterns)), re.IGNORECASE)
+        self._dangerous_re = re.compile('|'.join(map(re.escape, self.dangerous_patterns)), re.IGNORECASE)
+
+        # Oszlop szintű (vektorizált) teljes ellenőrzéshez egyetlen előre fordított union regex
+        self._full_series_re = re.compile(
+            '|'.join([pattern.pattern for pattern, _ in self.sql_patterns]
+                     + [self._update_re.pattern]
+                     + [re.escape(p) for p in self.dangerous_patterns]),
+            re.IGNORECASE
+        )
     
     def is_safe_value(self, key: str, value: str) -> bool:
         """
@@ -31,7 +88,8 @@ class SecurityService:
         - Gyors path: normál data mezőkhöz (name, price, description)
         - Teljes check: kritikus mezőkhöz (query, sql, script)
         """
-        if not value:
+        # Nem string (szám, bool, dátum) vagy üres érték: nincs mit vizsgálni
+        if not isinstance(value, str) or not value:
             return True
 
         # Hossz ellenőrzés (gyors)
@@ -39,60 +97,103 @@ class SecurityService:
             self._log_security_event('VALUE_TOO_LONG', key, value)
             return False
 
+        # Szám-szerű érték (bármely mezőben): nincs ';', '<', '(' - regex nélkül biztonságos
+        # issuperset() C-ben fut és az első nem engedélyezett karakternél megáll
+        if self._safe_chars.issuperset(value):
+            return True
+
+        # Oszlopnevek jellemzően már kisbetűsek: islower() olcsó, megspórolja a lower() másolatot
+        key_lower = key if key.islower() else key.lower()
+
         # Kritikus mező? Teljes ellenőrzés
-        if key.lower() in self.critical_fields:
+        if key_lower in self.critical_fields:
             return self._full_security_check(key, value)
 
+        # Normál data mező: túl rövid a legrövidebb mintához is -> biztonságos
+        if len(value) < self._quick_min_len:
+            return True
+
         # Normál data mező: csak alapvető ellenőrzés
         return self._quick_security_check(key, value)
 
     def _quick_security_check(self, key: str, value: str) -> bool:
         """Gyors security check normál data mezőkhöz (name, price, category stb.)"""
-        value_lower = value.lower()
-
-        # Csak a legveszélyesebb minták
-        critical_patterns = ['<script', 'javascript:', '; drop table', '; delete from', '; truncate']
-        for pattern in critical_patterns:
-            if pattern in value_lower:
-                self._log_security_event('CRITICAL_PATTERN', key, value, pattern)
-                return False
+        # Csak a legveszélyesebb minták (egyetlen union regex scan)
+        match = self._quick_re.search(value)
+        if match:
+            self._log_security_event('CRITICAL_PATTERN', key, value, match.group(0).lower())
+            return False
 
         return True
 
     def _full_security_check(self, key: str, value: str) -> bool:
         """Teljes security check kritikus mezőkhöz (query, sql, command)"""
-        value_lower = value.lower()
-
-        # SQL injection minták
-        for pattern, pattern_name in self.sql_patterns:
-            if re.search(pattern, value, re.IGNORECASE):
-                self._log_security_event('SQL_INJECTION_ATTEMPT', key, value, pattern_name)
+        # SQL injection minták - mind ';'-vel kezdődik: olcsó substring előszűrés a regex előtt
+        if ';' in value:
+            match = self._sql_union.search(value)
+            if match:
+                self._log_security_event('SQL_INJECTION_ATTEMPT', key, value, match.lastgroup)
                 return False
 
-        # UPDATE statement check (csak kritikus mezőknél)
-        if re.search(r'\bupdate\s+\w+\s+set\b', value_lower):
+        # UPDATE statement check (csak kritikus mezőknél) - 'u' nélkül nem lehet találat
+        if ('u' in value or 'U' in value) and self._update_re.search(value):
             self._log_security_event('SQL_UPDATE_DETECTED', key, value)
             return False
 
         # XSS és script injection
-        dangerous = ['<script', 'javascript:', '; drop table', '; delete from', 'exec(', 'eval(']
-        for danger in dangerous:
-            if danger in value_lower:
-                self._log_security_event('DANGEROUS_PATTERN', key, value, danger)
-                return False
+        match = self._dangerous_re.search(value)
+        if match:
+            self._log_security_event('DANGEROUS_PATTERN', key, value, match.group(0).lower())
+            return False
 
         return True
     
+    def is_safe_series(self, key: str, series: pd.Series) -> pd.Series:
+        """
+        Vektorizált is_safe_value egy teljes oszlopra - soronkénti Python hívások helyett
+        egyetlen előre fordított regex scan. Visszatérés: bool maszk (True = biztonságos)
+        """
+        # Szám/bool oszlop nem tartalmazhat veszélyes mintát
+        if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+            return pd.Series(True, index=series.index)
+
+        values = series.astype('string')
+        key_lower = key.lower()
+
+        too_long = values.str.len().gt(5000).fillna(False).astype(bool)
+        pattern = self._full_series_re if key_lower in self.critical_fields else self._quick_re
+        matched = values.str.contains(pattern, regex=True, na=False).astype(bool)
+        unsafe = too_long | matched
+
+        if unsafe.any():
+            # Ritka eset: eseménynaplózás csak a blokkolt cellákra
+            for value, is_long in zip(values[unsafe], too_long[unsafe]):
+                if is_long:
+                    self._log_security_event('VALUE_TOO_LONG', key, value)
+                else:
+                    self._log_security_event('CRITICAL_PATTERN', key, value, pattern.search(value).group(0))
+
+        return ~unsafe
+
     def validate_table_name(self, table_name: str) -> bool:
         """Tábla név validálása"""
-        if not table_name or len(table_name) > 100:
+        return _is_valid_table_name(table_name)
+    
+    def validate_email(self, email: str) -> bool:
+        """Email cím validálása (pl. szűrő paraméterekhez)"""
+        if not email or len(email) > 255:
             return False
-        return bool(re.match(r'^[a-zA-Z_][a-zA-Z0-9_]*$', table_name))
+        return bool(_EMAIL_RE.match(email))
     
     def _log_security_event(self, event_type: str, key: str, value: str, pattern: str = None):
-        """Biztonsági esemény naplózása"""
+        """Biztonsági esemény naplózása (ISO timestamp ezredmásodpercenként egyszer formázva)"""
+        t = time.time()
+        bucket = int(t * 1000)
+        if bucket != self._ts_cache[0]:
+            self._ts_cache = (bucket, datetime.fromtimestamp(t).isoformat())
+        
         event = {
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': self._ts_cache[1],
             'event_type': event_type,
             'field': key,
             'value': value[:100],  # Truncate for logging
@@ -102,14 +203,15 @@ class SecurityService:
         self.security_events.append(event)
         self.blocked_attempts.append(event)
         
-        logger.warning(f"Security event: {event_type} - field: {key}, pattern: {pattern}")
+        # Lazy formázás: letiltott WARNING szintnél nincs string építés
+        logger.warning("Security event: %s - field: %s, pattern: %s", event_type, key, pattern)
     
     def get_security_summary(self) -> Dict[str, Any]:
         """Biztonsági összefoglaló"""
         return {
             'total_events': len(self.security_events),
             'blocked_attempts': len(self.blocked_attempts),
-            'recent_events': self.security_events[-10:] if self.security_events else []
+            'recent_events': list(itertools.islice(reversed(self.security_events), 10))[::-1]
         }
     
     def clear_security_log(self):
@@ -1,60 +1,67 @@
-import psycopg2
 import csv
+import io
 import os
 from datetime import datetime
 import uuid
+from neon_connection import get_conn
 
-# Neon connection string
-conn_string = open('/home/fater/btppg-driver-kyma0/Neon_connection_string.txt').read().strip()
-
-# Connect
-conn = psycopg2.connect(conn_string)
+# Connect (közös, újrahasznált Neon kapcsolat)
+conn = get_conn()
 cur = conn.cursor()
 
-# Truncate first
+# Truncate first (UNLOGGED staging tábla: nincs WAL írás a betöltés alatt)
 print("Truncating table...")
 cur.execute("TRUNCATE TABLE products_csv RESTART IDENTITY")
+cur.execute("CREATE UNLOGGED TABLE IF NOT EXISTS products_csv_stg (LIKE products_csv INCLUDING DEFAULTS)")
+cur.execute("TRUNCATE TABLE products_csv_stg")
 conn.commit()
 
-# Read CSV
-print("Reading CSV...")
-with open('/home/fater/btppg-driver-kyma0/test_10k_products.csv', 'r') as f:
-    reader = csv.DictReader(f)
-    rows = list(reader)
-    print(f"Found {len(rows)} rows")
+CSV_PATH = '/home/fater/btppg-driver-kyma0/test_10k_products.csv'
+
+# Egy timestamp és email a teljes batch-re
+now = datetime.now()
+email = 'batch-import@test.com'
 
-# Batch insert
-print("Batch inserting...")
+def generate_rows(path):
+    """CSV streaming: egy menet, nincs list(reader) és soronkénti dict"""
+    with open(path, 'r', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        idx = {name: i for i, name in enumerate(header)}
+        n, p, c, d, s = idx['name'], idx['price'], idx['category'], idx['description'], idx['stock']
+        for row in reader:
+            yield (uuid.uuid4(), now, now, email,
+                   row[n], float(row[p] or 0), row[c], row[d], int(row[s] or 0))
+
+# Read CSV + batch insert
+print("Streaming CSV into COPY...")
 start = datetime.now()
 
-values = []
-for row in rows:
-    values.append((
-        str(uuid.uuid4()),
-        datetime.now(),
-        datetime.now(),
-        'batch-import@test.com',
-        row.get('name', ''),
-        float(row.get('price', 0)),
-        row.get('category', ''),
-        row.get('description', ''),
-        int(row.get('stock', 0))
-    ))
+# Bulk insert: COPY FROM STDIN - egyetlen round-trip soronkénti INSERT helyett
+buf = io.StringIO()
+csv.writer(buf).writerows(generate_rows(CSV_PATH))
+buf.seek(0)
+
+# Bulk load tranzakció: commit nem vár a WAL flush-ra, nagyobb work_mem
+cur.execute("SET LOCAL synchronous_commit = OFF")
+cur.execute("SET LOCAL work_mem = '64MB'")
 
-# Bulk insert
-query = """
-INSERT INTO products_csv (id, created_at, updated_at, auth_email, name, price, category, description, stock)
-VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-"""
+cur.copy_expert("""
+COPY products_csv_stg (id, created_at, updated_at, auth_email, name, price, category, description, stock)
+FROM STDIN WITH (FORMAT csv)
+""", buf)
 
-cur.executemany(query, values)
+# Staging -> céltábla egyetlen set-based INSERT-tel
+cur.execute("INSERT INTO products_csv SELECT * FROM products_csv_stg")
+inserted = cur.rowcount
+cur.execute("TRUNCATE TABLE products_csv_stg")
 conn.commit()
 
 end = datetime.now()
 duration = (end - start).total_seconds()
 
-print(f"Inserted {len(values)} records in {duration:.2f} seconds")
-print(f"Speed: {len(values)/duration:.0f} records/second")
+print(f"Inserted {inserted} records in {duration:.2f} seconds")
+print(f"Speed: {inserted/duration:.0f} records/second")
 
 # Verify
 cur.execute("SELECT COUNT(*) FROM products_csv")
@@ -1,13 +1,35 @@
-import psycopg2
-import csv
+from psycopg2.extras import execute_batch, execute_values, register_uuid
+import sys
 import time
 from datetime import datetime
 import uuid
+import pandas as pd
+from neon_connection import CONN_STRING, get_conn
 
-# Connection
-conn_string = open('/home/fater/btppg-driver-kyma0/Neon_connection_string.txt').read().strip()
-conn = psycopg2.connect(conn_string)
+# Insert mód: 'values' (execute_values, alapértelmezett), 'prepared' (PREPARE + EXECUTE)
+# vagy 'asyncpg' (bináris COPY, opcionális asyncpg csomag szükséges)
+# Használat: python test_batch_local.py [values|prepared|asyncpg]
+INSERT_MODE = sys.argv[1] if len(sys.argv) > 1 else 'values'
+PREPARED_PAGE_SIZE = 500
+
+# execute_values page_size: ~1 MB SQL statement-enként, 100..5000 sor között
+# (Neon-on az RTT dominál, ezért a nagyobb page jobb, de a túl nagy statement a server parser memóriáját terheli)
+VALUES_PAGE_TARGET_BYTES = 1_000_000
+
+
+def calibrate_page_size(rows, sample_size=100):
+    """page_size becslés az első néhány sor átlagos (szöveges) méretéből"""
+    sample = rows[:sample_size]
+    if not sample:
+        return 1000
+    avg_row_bytes = max(1, sum(len(str(row)) for row in sample) // len(sample))
+    return max(100, min(5000, VALUES_PAGE_TARGET_BYTES // avg_row_bytes))
+
+# Connection (közös, újrahasznált Neon kapcsolat)
+conn = get_conn()
 cur = conn.cursor()
+# uuid.UUID közvetlen átadása (str() nélkül)
+register_uuid()
 
 print("Testing batch insert performance...")
 
@@ -16,42 +38,80 @@ cur.execute("TRUNCATE TABLE products_csv RESTART IDENTITY")
 conn.commit()
 print("Table truncated")
 
-# Read 1000 rows from CSV
-rows = []
-with open('/home/fater/btppg-driver-kyma0/test_10k_products.csv', 'r') as f:
-    reader = csv.DictReader(f)
-    for i, row in enumerate(reader):
-        if i >= 1000:
-            break
-        rows.append(row)
+# Read 1000 rows from CSV - típusos beolvasás, a float/int konverzió vektorizáltan (C) történik
+df = pd.read_csv(
+    '/home/fater/btppg-driver-kyma0/test_10k_products.csv',
+    nrows=1000,
+    dtype={'name': 'string', 'category': 'string', 'description': 'string',
+           'price': 'float64', 'stock': 'int64'}
+)
+text_columns = ['name', 'category', 'description']
+df[text_columns] = df[text_columns].fillna('')
 
-print(f"Loaded {len(rows)} rows from CSV")
+print(f"Loaded {len(df)} rows from CSV")
 
 # Prepare batch data
-batch_data = []
-for row in rows:
-    batch_data.append((
-        str(uuid.uuid4()),
-        datetime.now(), 
-        datetime.now(),
-        'batch-test@demo.com',
-        row.get('name', ''),
-        float(row.get('price', 0)),
-        row.get('category', ''),
-        row.get('description', ''),
-        int(row.get('stock', 0))
-    ))
-
-# Batch insert
+# Egy timestamp és email a teljes batch-re, UUID-k előre generálva
+now = datetime.now()
+email = 'batch-test@demo.com'
+n = len(df)
+ids = [uuid.uuid4() for _ in range(n)]
+
+# Oszloponként tolist(): natív Python típusok (psycopg2 a NumPy skalárokat nem adaptálja)
+batch_data = list(zip(
+    ids,
+    [now] * n,
+    [now] * n,
+    [email] * n,
+    df['name'].tolist(),
+    df['price'].tolist(),
+    df['category'].tolist(),
+    df['description'].tolist(),
+    df['stock'].tolist()
+))
+
 start = time.time()
-cur.executemany("""
-    INSERT INTO products_csv (id, created_at, updated_at, auth_email, name, price, category, description, stock)
-    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-""", batch_data)
+if INSERT_MODE == 'prepared':
+    # Server-side prepared statement: parse/plan egyszer, a page-ek csak EXECUTE-ot küldenek
+    cur.execute("""
+        PREPARE batch_ins (uuid, timestamp, timestamp, text, text, float8, text, text, int4) AS
+        INSERT INTO products_csv (id, created_at, updated_at, auth_email, name, price, category, description, stock)
+        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
+    """)
+    execute_batch(cur, "EXECUTE batch_ins (%s, %s, %s, %s, %s, %s, %s, %s, %s)",
+                  batch_data, page_size=PREPARED_PAGE_SIZE)
+    cur.execute("DEALLOCATE batch_ins")
+elif INSERT_MODE == 'asyncpg':
+    # Bináris COPY protokoll (copy_records_to_table): nincs soronkénti Bind/Execute/Sync
+    # Az időmérés az asyncpg kapcsolódást is tartalmazza
+    import asyncio
+    import asyncpg
+
+    async def copy_with_asyncpg():
+        apg_conn = await asyncpg.connect(CONN_STRING)
+        try:
+            await apg_conn.copy_records_to_table(
+                'products_csv',
+                records=batch_data,
+                columns=['id', 'created_at', 'updated_at', 'auth_email',
+                         'name', 'price', 'category', 'description', 'stock']
+            )
+        finally:
+            await apg_conn.close()
+
+    asyncio.run(copy_with_asyncpg())
+else:
+    # Batch insert: multi-row VALUES (execute_values) - page_size soronként egy round-trip
+    page_size = calibrate_page_size(batch_data)
+    print(f"execute_values page_size: {page_size}")
+    execute_values(cur, """
+        INSERT INTO products_csv (id, created_at, updated_at, auth_email, name, price, category, description, stock)
+        VALUES %s
+    """, batch_data, page_size=page_size)
 conn.commit()
 duration = time.time() - start
 
-print(f"Inserted {len(batch_data)} records in {duration:.2f} seconds")
+print(f"Inserted {len(batch_data)} records in {duration:.2f} seconds (mode: {INSERT_MODE})")
 print(f"Speed: {len(batch_data)/duration:.0f} records/second")
 
 # Verify
@@ -0,0 +1,58 @@
+import io
+import unittest
+from unittest import mock
+
+from flask import Flask
+
+from api.routes import test_routes
+
+
+class _FakeConn:
+    def cursor(self):
+        return mock.MagicMock()
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+class BulkInsertNoAuthTest(unittest.TestCase):
+    """bulk_insert_no_auth CSV -> row tuples, without a database"""
+
+    def setUp(self):
+        app = Flask(__name__)
+        app.db_manager = mock.MagicMock()
+        app.db_manager._get_connection.return_value = _FakeConn()
+        app.register_blueprint(test_routes.test_bp)
+        self.client = app.test_client()
+
+    def _post_csv(self, text):
+        inserted = []
+        with mock.patch.object(test_routes, 'execute_values',
+                               side_effect=lambda cur, sql, rows, page_size: inserted.extend(rows)):
+            response = self.client.post('/test/bulk-insert/products_csv', data={
+                'file': (io.BytesIO(text.encode('utf-8')), 'products.csv')
+            })
+        return response, inserted
+
+    def test_blank_lines_are_skipped(self):
+        response, inserted = self._post_csv(
+            "name,price,category,description,stock\r\n"
+            "A,1.5,c,d,2\r\n"
+            "\r\n"
+            "B,,c,d,\r\n"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['records_inserted'], 2)
+        self.assertEqual([(row[4], row[5], row[8]) for row in inserted], [('A', 1.5, 2), ('B', 0.0, 0)])
+
+    def test_short_rows_are_padded(self):
+        response, inserted = self._post_csv("name,price,stock\nA,1\n")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([(row[4], row[5], row[6], row[8]) for row in inserted], [('A', 1.0, '', 0)])
+
+
+if __name__ == '__main__':
+    unittest.main()